@@ -1,45 +1,192 @@
-from flask import Flask, render_template, redirect, url_for, jsonify, request, session, flash
-import mysql.connector
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
-from PIL import Image
+import time
+_boot_start = time.perf_counter()
+
+from flask import Flask, Response, render_template, redirect, url_for, jsonify, request, session, flash
 from functools import wraps
-import numpy as np
+from markupsafe import Markup
+import logging
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import pickle
-import joblib
+import threading
 from flask_cors import CORS
-from google.oauth2 import id_token
-from google.auth.transport import requests
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import (
     JWTManager, create_access_token,
     jwt_required, get_jwt_identity
 )
-
+import assets
+import database
+import metrics
+import migrations
+import querylog
+import ratings
+import registry
+import sentiment
+import uploads
+from hashing import PasswordHasher, HasherBusy
+from google_auth import GoogleTokenVerifier, HttpCertSource
+from stats import DashboardStats
+from generations import Generations
+from pagination import decode_cursor, keyset_page, parse_limit, stream_json_array
+from database import db, cursor
+from inference import BatchPredictor, PredictorBusy, LABELS, load_image, image_hash
+from backends import make_backend
+from cache import LRUCache
+from httpcache import PageCache
+from jobs import JobManager, JobStore, QueueFull
+from rekomendasi import RecommendationIndex, Ranker
+
+
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'))
+log = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'kunci-rahasia-teman-tukang-yang-kuat'
 GOOGLE_CLIENT_ID = "240598274854-fvn01rhgje8ab3li5pfmpopgmqb5scfa.apps.googleusercontent.com"
 app.config['JWT_SECRET_KEY'] = 'jwt-rahasia-teman-tukang'
+app.config['GOOGLE_CERTS_URL'] = os.environ.get('GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
 jwt = JWTManager(app)
 
 CORS(app)
-bcrypt = Bcrypt(app)
 
-db = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="",
-    database="capstone_web"
+# bcrypt dijalankan di process pool supaya tidak memblokir thread request
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+app.config['BCRYPT_POOL_WORKERS'] = int(os.environ.get('BCRYPT_POOL_WORKERS', 2))
+app.config['BCRYPT_MAX_PENDING'] = int(os.environ.get('BCRYPT_MAX_PENDING', 64))
+hasher = PasswordHasher(
+    rounds=app.config['BCRYPT_LOG_ROUNDS'],
+    workers=app.config['BCRYPT_POOL_WORKERS'],
+    max_pending=app.config['BCRYPT_MAX_PENDING']
+)
+
+# database (pool koneksi, satu koneksi per request)
+app.config['DB_HOST'] = os.environ.get('DB_HOST', 'localhost')
+app.config['DB_USER'] = os.environ.get('DB_USER', 'root')
+app.config['DB_PASSWORD'] = os.environ.get('DB_PASSWORD', '')
+app.config['DB_NAME'] = os.environ.get('DB_NAME', 'capstone_web')
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 10))
+app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+database.init_app(app)
+ratings.init_app(app)
+
+# migrasi skema (flask db upgrade|status|verify), dicek saat startup()
+# DB_SCHEMA_CHECK: warn | strict | off
+app.config['DB_SCHEMA_CHECK'] = os.environ.get('DB_SCHEMA_CHECK', 'warn')
+migrations.init_app(app)
+schema_check = None
+
+# metrics prometheus di /metrics: latency route, query sql, model, template
+app.config['METRICS_SERVER_TIMING'] = os.environ.get('METRICS_SERVER_TIMING', '0') == '1'
+app_metrics = metrics.Metrics()
+metrics.init_app(app, app_metrics)
+database.on_query(app_metrics.observe_query)
+app_metrics.gauge('db_pool_in_use', 'Koneksi database yang sedang dipinjam',
+                  lambda: database.pool.stats()['in_use'])
+# memori proses ini; dengan serve.py (pre-fork) shared = bagian yang dibagi dengan master
+app_metrics.gauge('process_resident_bytes', 'Memori resident (RSS) proses',
+                  lambda: metrics.memory_usage()['rss'])
+app_metrics.gauge('process_shared_bytes', 'Memori resident yang dibagi dengan proses lain',
+                  lambda: metrics.memory_usage()['shared'])
+app_metrics.gauge('process_pss_bytes', 'Proportional set size proses',
+                  lambda: metrics.memory_usage()['pss'])
+
+# budget query per request, deteksi N+1 dan slow-query log (+EXPLAIN)
+# QUERY_BUDGETS per endpoint, contoh: "admin_dashboard=2,lihat_tukang=3"
+app.config['QUERY_BUDGET'] = int(os.environ.get('QUERY_BUDGET', 30))
+app.config['QUERY_BUDGETS'] = dict(
+    (k.strip(), int(v)) for k, v in
+    (item.split('=') for item in os.environ.get('QUERY_BUDGETS', '').split(',') if item.strip())
+)
+app.config['QUERY_BUDGET_DB_MS'] = float(os.environ.get('QUERY_BUDGET_DB_MS', 200))
+app.config['QUERY_REPEAT_THRESHOLD'] = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 100))
+app.config['SLOW_QUERY_LOG'] = os.environ.get('SLOW_QUERY_LOG')
+app.config['QUERY_EXPLAIN'] = os.environ.get('QUERY_EXPLAIN', '1') == '1'
+app.config['QUERY_BUDGET_STRICT'] = os.environ.get('QUERY_BUDGET_STRICT', '0') == '1'
+query_tracker = querylog.QueryTracker(
+    max_queries=app.config['QUERY_BUDGET'],
+    max_db_ms=app.config['QUERY_BUDGET_DB_MS'],
+    repeat_threshold=app.config['QUERY_REPEAT_THRESHOLD'],
+    slow_ms=app.config['SLOW_QUERY_MS'],
+    budgets=app.config['QUERY_BUDGETS'],
+    explain=app.config['QUERY_EXPLAIN'],
+    strict=app.config['QUERY_BUDGET_STRICT']
+)
+querylog.init_app(app, query_tracker)
+
+# aset statis ber-fingerprint + varian webp (flask assets build)
+# dan cache halaman statis dengan ETag/304
+app.config['PAGE_CACHE'] = os.environ.get('PAGE_CACHE', '1') == '1'
+app.config['PAGE_CACHE_MAX_AGE'] = int(os.environ.get('PAGE_CACHE_MAX_AGE', 300))
+static_assets = assets.Assets(app.static_folder)
+assets.init_app(app, static_assets)
+page_cache = PageCache(max_age=app.config['PAGE_CACHE_MAX_AGE'], enabled=app.config['PAGE_CACHE'])
+
+# cache per proses (profil, rekomendasi, dashboard) diperbarui bila worker
+# lain menulis: ulasan diterapkan per tukang lewat log perubahan, perubahan
+# data tukang oleh admin memicu refit; SHARED_STATE_FILE hanya perlu bila
+# worker tidak di-fork dari proses yang meng-import app (lihat generations.py)
+app.config['SHARED_STATE_FILE'] = os.environ.get('SHARED_STATE_FILE')
+app.config['SHARED_STATE_LOG_SIZE'] = int(os.environ.get('SHARED_STATE_LOG_SIZE', 4096))
+generations = Generations(('dashboard',), app.config['SHARED_STATE_FILE'],
+                          kinds=('review', 'tukang'),
+                          log_size=app.config['SHARED_STATE_LOG_SIZE'])
+
+@app.before_request
+def sync_shared_state():
+    changes = generations.changes()
+    if changes is None:
+        # log sudah tertimpa sebelum sempat dibaca
+        profil_cache.clear()
+        rec_index.request_refit()
+    else:
+        for kind, tukang_id, rating, negatif in changes:
+            profil_cache.delete(tukang_id)
+            if kind == 'review':
+                rec_index.add_review(tukang_id, rating, 'negatif' if negatif else 'positif')
+            else:
+                rec_index.request_refit()
+    if generations.changed('dashboard'):
+        dashboard_stats.expire()
+
+# statistik dashboard admin (cache + update incremental)
+app.config['DASHBOARD_STATS_TTL'] = int(os.environ.get('DASHBOARD_STATS_TTL', 60))
+dashboard_stats = DashboardStats(ttl=app.config['DASHBOARD_STATS_TTL'])
+
+# registry model: tensorflow, scikit-learn dan index rekomendasi baru
+# di-load saat pertama dipakai (atau di-warm di background)
+models = registry.ModelRegistry()
+registry.init_app(app, models)
+
+# model cnn, backend: keras | tflite | onnx (lihat tools/convert_model.py)
+app.config['DETEKSI_BACKEND'] = os.environ.get('DETEKSI_BACKEND', 'keras')
+app.config['DETEKSI_MODEL_PATH'] = os.environ.get('DETEKSI_MODEL_PATH')
+app.config['DETEKSI_NUM_THREADS'] = int(os.environ.get('DETEKSI_NUM_THREADS', 0)) or None
+
+models.register('cnn', lambda: make_backend(
+    app.config['DETEKSI_BACKEND'],
+    app.config['DETEKSI_MODEL_PATH'],
+    num_threads=app.config['DETEKSI_NUM_THREADS']
+))
+labels = LABELS
+
+# batching prediksi antar request
+app.config['DETEKSI_BATCHING'] = os.environ.get('DETEKSI_BATCHING', '1') == '1'
+app.config['DETEKSI_MAX_BATCH'] = int(os.environ.get('DETEKSI_MAX_BATCH', 16))
+app.config['DETEKSI_MAX_WAIT_MS'] = float(os.environ.get('DETEKSI_MAX_WAIT_MS', 10))
+def predict_cnn(batch):
+    with app_metrics.time_model('cnn'):
+        return models.get('cnn').predict(batch)
+
+predictor = BatchPredictor(
+    predict_cnn,
+    labels,
+    max_batch_size=app.config['DETEKSI_MAX_BATCH'],
+    max_wait_ms=app.config['DETEKSI_MAX_WAIT_MS'],
+    enabled=app.config['DETEKSI_BATCHING']
 )
-cursor = db.cursor(dictionary=True)
 
-# model cnn
-model = load_model("model/model_temantukang.keras")
-labels = ["Retak Dinding", "Plafon Rusak", "Keramik Rusak", "Cat Mengelupas", "Kayu Kusen Lapuk", "Dinding Berjamur"]
+# cache hasil deteksi berdasarkan hash isi gambar (sha256)
+app.config['DETEKSI_CACHE_SIZE'] = int(os.environ.get('DETEKSI_CACHE_SIZE', 2048))
+deteksi_cache = LRUCache(maxsize=app.config['DETEKSI_CACHE_SIZE'])
 
 analisis_faktor = {
     "Retak Dinding": "Kerusakan terjadi karena fondasi mengalami penurunan tidak merata, getaran berulang, atau tekanan beban berlebih pada struktur dinding.",
@@ -49,16 +196,101 @@ analisis_faktor = {
     "Kayu Kusen Lapuk": "Kusen kayu dapat lapuk karena paparan air, kelembaban tinggi, atau serangan jamur dan rayap, sehingga kayu kehilangan kekuatan strukturalnya.",
     "Dinding Berjamur": "Dinding berjamur terjadi akibat kelembaban berlebih, ventilasi yang buruk, atau rembesan air yang terus-menerus, sehingga jamur berkembang di permukaan dinding.",
 }
+
+def deteksi_gambar(data):
+    """Deteksi kerusakan dari bytes gambar, memakai cache hash isi gambar."""
+    key = image_hash(data)
+    cached = deteksi_cache.get(key)
+    if cached:
+        return cached
+
+    # termasuk waktu tunggu batch
+    with app_metrics.time_model('deteksi'):
+        hasil, confidence = predictor.predict(load_image(data))
+    deteksi_cache.set(key, (hasil, confidence))
+    return hasil, confidence
+
+def deteksi_job(data):
+    hasil, confidence = deteksi_gambar(data)
+    return {
+        "hasil": hasil,
+        "confidence": round(confidence, 2),
+        "analisis_faktor": analisis_faktor.get(hasil, "Tidak ada analisis tersedia.")
+    }
+
+# upload deteksi: nama file = sha256 isi, di-shard (uploads/ab/cd/...)
+app.config['UPLOAD_DIR'] = os.environ.get('UPLOAD_DIR', os.path.join(app.static_folder, 'uploads'))
+upload_store = uploads.UploadStore(app.config['UPLOAD_DIR'])
+uploads.init_app(app, upload_store)
+
+# job deteksi async untuk api mobile
+app.config['DETEKSI_JOB_WORKERS'] = int(os.environ.get('DETEKSI_JOB_WORKERS', 2))
+app.config['DETEKSI_JOB_QUEUE'] = int(os.environ.get('DETEKSI_JOB_QUEUE', 64))
+app.config['DETEKSI_JOB_TTL'] = int(os.environ.get('DETEKSI_JOB_TTL', 600))
+# status/hasil di tabel deteksi_jobs supaya bisa di-poll dari worker mana pun
+deteksi_jobs = JobManager(
+    JobStore(ttl=app.config['DETEKSI_JOB_TTL']),
+    workers=app.config['DETEKSI_JOB_WORKERS'],
+    max_pending=app.config['DETEKSI_JOB_QUEUE']
+)
+app_metrics.gauge('deteksi_job_queue_depth', 'Job deteksi yang menunggu worker',
+                  lambda: deteksi_jobs.stats()['queue_depth'])
  
 # model review
-svm_model = joblib.load('model/svm_model.pkl')
-tfidf = joblib.load('model/tfidf_vectorizer.pkl')
-
+def load_joblib(path):
+    def loader():
+        import joblib
+        return joblib.load(path)
+    return loader
+
+models.register('svm', load_joblib('model/svm_model.pkl'))
+models.register('tfidf', load_joblib('model/tfidf_vectorizer.pkl'))
+
+# model sentiment online: hashing + SGD, dilatih incremental dari tabel review
+# SENTIMENT_MODEL: svm (pickle lama) | online (fallback ke svm sampai siap)
+# SENTIMENT_TRAIN: off (pakai `flask sentiment train --follow`) | thread
+app.config['SENTIMENT_MODEL'] = os.environ.get('SENTIMENT_MODEL', 'svm')
+app.config['SENTIMENT_DIR'] = os.environ.get('SENTIMENT_DIR', 'model/sentiment')
+app.config['SENTIMENT_RELOAD_INTERVAL'] = int(os.environ.get('SENTIMENT_RELOAD_INTERVAL', 30))
+app.config['SENTIMENT_MIN_SAMPLES'] = int(os.environ.get('SENTIMENT_MIN_SAMPLES', 1000))
+app.config['SENTIMENT_BATCH_SIZE'] = int(os.environ.get('SENTIMENT_BATCH_SIZE', 512))
+app.config['SENTIMENT_TRAIN'] = os.environ.get('SENTIMENT_TRAIN', 'off')
+app.config['SENTIMENT_TRAIN_INTERVAL'] = int(os.environ.get('SENTIMENT_TRAIN_INTERVAL', 60))
+sentiment_store = sentiment.CheckpointStore(app.config['SENTIMENT_DIR'])
+online_sentiment = sentiment.OnlineSentiment(
+    sentiment_store,
+    reload_interval=app.config['SENTIMENT_RELOAD_INTERVAL'],
+    min_samples=app.config['SENTIMENT_MIN_SAMPLES']
+)
+sentiment_trainer = sentiment.SentimentTrainer(
+    sentiment_store,
+    batch_size=app.config['SENTIMENT_BATCH_SIZE'],
+    interval=app.config['SENTIMENT_TRAIN_INTERVAL'],
+    on_checkpoint=lambda version: online_sentiment.reload()
+)
+sentiment.init_app(app, sentiment_trainer, online_sentiment)
+if app.config['SENTIMENT_MODEL'] == 'online':
+    models.register('sentiment', online_sentiment.reload)
+    app_metrics.gauge('sentiment_model_version', 'Versi checkpoint model sentiment yang aktif',
+                      lambda: online_sentiment.stats()['version'] or 0)
 def predict_sentiment(text):
-    text_tfidf = tfidf.transform([text])
-    result = svm_model.predict(text_tfidf)[0]
-
-    return "positif" if result == 1 else "negatif"
+    return predict_sentiment_batch([text])[0]
+
+def predict_sentiment_batch(texts):
+    if not texts:
+        return []
+    model = None
+    if app.config['SENTIMENT_MODEL'] == 'online':
+        model = models.get('sentiment').current()
+    if model is not None:
+        with app_metrics.time_model('sentiment'):
+            results = model.predict(texts)
+    else:
+        with app_metrics.time_model('tfidf'):
+            text_tfidf = models.get('tfidf').transform(texts)
+        with app_metrics.time_model('svm'):
+            results = models.get('svm').predict(text_tfidf)
+    return ["positif" if r == 1 else "negatif" for r in results]
 
 def login_required(f):
     @wraps(f)
@@ -70,15 +302,69 @@ def login_required(f):
     return decorated_function
 
 # cbf (content based filtering - rekomendasi perhitungan)
-cursor.execute("SELECT * FROM tukang")
-TUKANG_DATA = cursor.fetchall() 
+# jumlah_negatif adalah counter di tabel tukang (lihat ratings.py)
+TUKANG_SQL = "SELECT t.* FROM tukang t"
+
+def load_tukang():
+    with database.pool.connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(TUKANG_SQL)
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+def fetch_tukang(id_tukang):
+    cursor.execute(TUKANG_SQL + " WHERE t.id_tukang=%s", (id_tukang,))
+    return cursor.fetchone()
+
+def parse_halaman(args, default_limit=20, max_limit=100):
+    try:
+        limit = int(args.get('limit', default_limit))
+        offset = int(args.get('offset', 0))
+    except (TypeError, ValueError):
+        limit, offset = default_limit, 0
+    return max(1, min(limit, max_limit)), max(0, offset)
+
+app.config['REKOMENDASI_REFIT_INTERVAL'] = int(os.environ.get('REKOMENDASI_REFIT_INTERVAL', 300))
+# refit dari database walaupun tidak ada perubahan lokal (0 = tidak); cadangan
+# untuk perubahan di luar app (penulisan worker lain lewat `generations`)
+app.config['REKOMENDASI_MAX_AGE'] = int(os.environ.get('REKOMENDASI_MAX_AGE', 0))
+# bobot ranking: kemiripan, rating (bayesian), porsi ulasan negatif
+app.config['REKOMENDASI_W_SIMILARITY'] = float(os.environ.get('REKOMENDASI_W_SIMILARITY', 0.7))
+app.config['REKOMENDASI_W_RATING'] = float(os.environ.get('REKOMENDASI_W_RATING', 0.3))
+app.config['REKOMENDASI_W_NEGATIF'] = float(os.environ.get('REKOMENDASI_W_NEGATIF', 0.2))
+app.config['REKOMENDASI_PRIOR_COUNT'] = float(os.environ.get('REKOMENDASI_PRIOR_COUNT', 5))
+app.config['REKOMENDASI_CACHE_SIZE'] = int(os.environ.get('REKOMENDASI_CACHE_SIZE', 512))
+app.config['REKOMENDASI_CACHE_TTL'] = int(os.environ.get('REKOMENDASI_CACHE_TTL', 600))
+rec_index = RecommendationIndex(
+    load_tukang,
+    refit_interval=app.config['REKOMENDASI_REFIT_INTERVAL'],
+    ranker=Ranker(
+        w_similarity=app.config['REKOMENDASI_W_SIMILARITY'],
+        w_rating=app.config['REKOMENDASI_W_RATING'],
+        w_negatif=app.config['REKOMENDASI_W_NEGATIF'],
+        prior_count=app.config['REKOMENDASI_PRIOR_COUNT']
+    ),
+    cache_size=app.config['REKOMENDASI_CACHE_SIZE'],
+    cache_ttl=app.config['REKOMENDASI_CACHE_TTL'],
+    max_age=app.config['REKOMENDASI_MAX_AGE']
+)
 
-dokumen_tukang = [f"{t['keahlian']} {t['pengalaman']}" for t in TUKANG_DATA]
+def load_rekomendasi():
+    rec_index.refit()
+    # halaman pertama untuk semua label deteksi langsung masuk cache
+    rec_index.warm(labels, limit=parse_halaman({})[0])
+    rec_index.start_background()
+    return rec_index
 
-vectorizer = TfidfVectorizer()
-TFIDF_MATRIX = vectorizer.fit_transform(dokumen_tukang)
+models.register('rekomendasi', load_rekomendasi)
+
+# verifikasi id_token google: sertifikat di-cache sesuai max-age
+google_verifier = GoogleTokenVerifier(
+    GOOGLE_CLIENT_ID,
+    source=HttpCertSource(app.config['GOOGLE_CERTS_URL'])
+)
 
-print("TF-IDF tukang berhasil di-load (cached)")
 # api login google
 @app.route('/api/login', methods=['POST'])
 def api_login():
@@ -98,8 +384,19 @@ def api_login():
     if not user:
         return jsonify({"error": "User tidak ditemukan"}), 404
 
-    if not bcrypt.check_password_hash(user['password'], password):
-        return jsonify({"error": "Password salah"}), 401
+    try:
+        if not hasher.check(user['password'], password):
+            return jsonify({"error": "Password salah"}), 401
+
+        # work factor berubah: simpan ulang hash dengan cost yang baru
+        if hasher.needs_rehash(user['password']):
+            cursor.execute(
+                "UPDATE users SET password=%s WHERE id_users=%s",
+                (hasher.hash(password), user['id_users'])
+            )
+            db.commit()
+    except HasherBusy:
+        return jsonify({"error": "Server sedang sibuk, coba lagi"}), 503
 
     access_token = create_access_token(identity=user['id_users'])
 
@@ -125,13 +422,18 @@ def api_register():
     if cursor.fetchone():
         return jsonify({"error": "Email sudah terdaftar"}), 409
 
-    hashed = bcrypt.generate_password_hash(password).decode('utf-8')
+    try:
+        hashed = hasher.hash(password)
+    except HasherBusy:
+        return jsonify({"error": "Server sedang sibuk, coba lagi"}), 503
 
     cursor.execute("""
         INSERT INTO users (username, email, password, role, auth_provider)
         VALUES (%s,%s,%s,'customer','local')
     """, (username, email, hashed))
     db.commit()
+    dashboard_stats.add_customer()
+    generations.bump('dashboard')
 
     return jsonify({"message": "Register berhasil"}), 201
 @app.route('/api/auth/google', methods=['POST'])
@@ -142,11 +444,7 @@ def api_login_google():
         return jsonify({"error": "id_token wajib"}), 400
 
     try:
-        idinfo = id_token.verify_oauth2_token(
-            token,
-            requests.Request(),
-            GOOGLE_CLIENT_ID
-        )
+        idinfo = google_verifier.verify(token)
 
         google_id = idinfo['sub']
         email = idinfo['email']
@@ -165,12 +463,10 @@ def api_login_google():
                 VALUES (%s,%s,NULL,'customer','google',%s)
             """, (username, email, google_id))
             db.commit()
+            dashboard_stats.add_customer()
+            generations.bump('dashboard')
 
-            cursor.execute(
-                "SELECT * FROM users WHERE google_id=%s",
-                (google_id,)
-            )
-            user = cursor.fetchone()
+            user = {"id_users": cursor.lastrowid, "username": username, "email": email}
 
         access_token = create_access_token(identity=user['id_users'])
 
@@ -193,24 +489,31 @@ def api_rekomendasi():
     data = request.get_json()
     jenis_kerusakan = data["jenis_kerusakan"]
 
-    query_vec = vectorizer.transform([jenis_kerusakan])
-    sim_scores = cosine_similarity(query_vec, TFIDF_MATRIX).flatten()
+    limit, offset = parse_halaman(data)
+    with app_metrics.time_model('rekomendasi'):
+        hasil, total = models.get('rekomendasi').search(jenis_kerusakan, limit=limit, offset=offset)
 
     rekomendasi = []
-    for i, t in enumerate(TUKANG_DATA):
-        if sim_scores[i] >= 0.1:
-            rekomendasi.append({
-                "id_tukang": t["id_tukang"],
-                "nama": t["nama"],
-                "keahlian": t["keahlian"],
-                "pengalaman": t["pengalaman"],
-                "rating": t.get("rating", 0),
-                "foto": t.get("foto", "")
-            })
+    for h in hasil:
+        t = h.row
+        rekomendasi.append({
+            "id_tukang": t["id_tukang"],
+            "nama": t["nama"],
+            "keahlian": t["keahlian"],
+            "pengalaman": t["pengalaman"],
+            "rating": h.rating,
+            "jumlah_ulasan": h.jumlah_ulasan,
+            "foto": t.get("foto", ""),
+            "similarity": h.similarity,
+            "score": h.score
+        })
 
     return jsonify({
         "status": "success",
-        "data": rekomendasi
+        "data": rekomendasi,
+        "total": total,
+        "limit": limit,
+        "offset": offset
     })
 
 @app.route('/api/review', methods=['POST'])
@@ -235,20 +538,14 @@ def add_review():
             VALUES (%s, %s, %s, %s, %s)
         """, (user_id, tukang_id, review_text, sentiment, rating))
 
-        cursor.execute("""
-            UPDATE tukang
-            SET 
-                rating = (
-                    SELECT IFNULL(AVG(rating), 0)
-                    FROM review WHERE tukang_id=%s
-                ),
-                jumlah_ulasan = (
-                    SELECT COUNT(*) FROM review WHERE tukang_id=%s
-                )
-            WHERE id_tukang=%s
-        """, (tukang_id, tukang_id, tukang_id))
+        ratings.apply_reviews(cursor, [(tukang_id, rating, sentiment)])
 
         db.commit()
+        rec_index.add_review(int(tukang_id), rating, sentiment)
+        dashboard_stats.add_reviews([rating])
+        profil_cache.delete(int(tukang_id))
+        generations.log('review', int(tukang_id), rating, sentiment == 'negatif')
+        generations.bump('dashboard')
 
         return jsonify({
             "status": "success",
@@ -259,6 +556,134 @@ def add_review():
         db.rollback()
         return jsonify({"status": "error", "message": str(e)}), 500
     
+app.config['REVIEW_BATCH_MAX'] = int(os.environ.get('REVIEW_BATCH_MAX', 500))
+
+@app.route('/api/review/batch', methods=['POST'])
+@jwt_required()
+def add_review_batch():
+    data = request.get_json(silent=True) or {}
+    items = data.get('reviews')
+    user_id = get_jwt_identity()
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"status": "error", "message": "Field reviews wajib berupa list"}), 400
+    if len(items) > app.config['REVIEW_BATCH_MAX']:
+        return jsonify({
+            "status": "error",
+            "message": f"Maksimal {app.config['REVIEW_BATCH_MAX']} ulasan per batch"
+        }), 413
+
+    results = [None] * len(items)
+    valid = []
+    db_error = False
+    for i, item in enumerate(items):
+        try:
+            tukang_id = int(item['tukang_id'])
+            rating = int(item['rating'])
+            review_text = str(item['review_text']).strip()
+        except (KeyError, TypeError, ValueError):
+            results[i] = {"index": i, "status": "error", "message": "Data tidak lengkap"}
+            continue
+
+        if not review_text or not 1 <= rating <= 5:
+            results[i] = {"index": i, "status": "error", "message": "Data tidak valid"}
+            continue
+        valid.append((i, tukang_id, review_text, rating))
+
+    if valid:
+        tukang_ids = sorted({v[1] for v in valid})
+        placeholders = ",".join(["%s"] * len(tukang_ids))
+        cursor.execute(
+            f"SELECT id_tukang FROM tukang WHERE id_tukang IN ({placeholders})",
+            tuple(tukang_ids)
+        )
+        ada = {r['id_tukang'] for r in cursor.fetchall()}
+
+        for v in [v for v in valid if v[1] not in ada]:
+            results[v[0]] = {"index": v[0], "status": "error", "message": "Tukang tidak ditemukan"}
+        valid = [v for v in valid if v[1] in ada]
+
+    if valid:
+        sentiments = predict_sentiment_batch([v[2] for v in valid])
+        rows = [
+            (user_id, tukang_id, review_text, sentiment, rating)
+            for (_, tukang_id, review_text, rating), sentiment in zip(valid, sentiments)
+        ]
+
+        try:
+            cursor.executemany("""
+                INSERT INTO review (user_id, tukang_id, review_text, sentiment, rating)
+                VALUES (%s, %s, %s, %s, %s)
+            """, rows)
+
+            ratings.apply_reviews(cursor, [(r[1], r[4], r[3]) for r in rows])
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for v in valid:
+                results[v[0]] = {"index": v[0], "status": "error", "message": str(e)}
+            valid = []
+            db_error = True
+        else:
+            for (i, tukang_id, _, rating), sentiment in zip(valid, sentiments):
+                rec_index.add_review(tukang_id, rating, sentiment)
+                profil_cache.delete(tukang_id)
+                generations.log('review', tukang_id, rating, sentiment == 'negatif')
+                results[i] = {"index": i, "status": "success", "sentiment": sentiment}
+            dashboard_stats.add_reviews([v[3] for v in valid])
+            generations.bump('dashboard')
+
+    inserted = len(valid)
+    if inserted == len(items):
+        status, code = "success", 201
+    elif inserted:
+        status, code = "partial", 207
+    else:
+        status, code = "error", 500 if db_error else 400
+
+    return jsonify({
+        "status": status,
+        "inserted": inserted,
+        "failed": len(items) - inserted,
+        "results": results
+    }), code
+    
+@app.route('/api/deteksi', methods=['POST'])
+@jwt_required()
+def api_deteksi():
+    file = request.files.get('file')
+    if not file:
+        return jsonify({"status": "error", "message": "File gambar wajib"}), 400
+
+    data = file.read()
+    if not data:
+        return jsonify({"status": "error", "message": "File gambar kosong"}), 400
+
+    try:
+        job_id = deteksi_jobs.submit(deteksi_job, data, owner=str(get_jwt_identity()))
+    except QueueFull:
+        return jsonify({"status": "error", "message": "Server sedang sibuk, coba lagi"}), 503
+
+    return jsonify({
+        "status": "pending",
+        "job_id": job_id,
+        "url": url_for('api_deteksi_status', job_id=job_id)
+    }), 202
+
+@app.route('/api/deteksi/<job_id>', methods=['GET'])
+@jwt_required()
+def api_deteksi_status(job_id):
+    job = deteksi_jobs.get(job_id, owner=str(get_jwt_identity()))
+    if not job:
+        return jsonify({"status": "error", "message": "Job tidak ditemukan atau sudah kedaluwarsa"}), 404
+
+    if job["status"] == "done":
+        return jsonify({"status": "done", "job_id": job_id, "data": job["result"]})
+    if job["status"] == "error":
+        return jsonify({"status": "error", "job_id": job_id, "message": job["error"]}), 500
+    return jsonify({"status": job["status"], "job_id": job_id}), 202
+
 # route admin
 @app.route('/admin')
 def admin_dashboard():
@@ -266,40 +691,14 @@ def admin_dashboard():
         flash("Akses ditolak!", "danger")
         return redirect(url_for('login_admin'))
 
-    # total tukang
-    cursor.execute("SELECT COUNT(*) AS total FROM tukang")
-    total_tukang = cursor.fetchone()['total']
-
-    # total customer
-    cursor.execute("""
-        SELECT COUNT(*) AS total
-        FROM users
-        WHERE role = 'customer'
-    """)
-    total_customer = cursor.fetchone()['total']
-
-    # rata-rata rating tukang
-    cursor.execute("""
-        SELECT IFNULL(ROUND(AVG(rating),1),0) AS avg_rating
-        FROM review
-    """)
-    avg_rating = cursor.fetchone()['avg_rating']
-
-    # jumlah rating per bintang
-    rating_counts = {}
-    for i in range(1, 6):
-        cursor.execute("""
-            SELECT COUNT(*) AS total
-            FROM review
-            WHERE rating=%s
-        """, (i,))
-        rating_counts[i] = cursor.fetchone()['total']
+    stats = dashboard_stats.get()
+    rating_counts = stats['rating_counts']
 
     return render_template(
         'admin/admin_dashboard.html',
-        total_tukang=total_tukang,
-        total_customer=total_customer,
-        avg_rating=avg_rating,
+        total_tukang=stats['total_tukang'],
+        total_customer=stats['total_customer'],
+        avg_rating=stats['avg_rating'],
         rating_1=rating_counts[1],
         rating_2=rating_counts[2],
         rating_3=rating_counts[3],
@@ -307,6 +706,45 @@ def admin_dashboard():
         rating_5=rating_counts[5]
     )
 
+@app.route('/admin/db-stats')
+def admin_db_stats():
+    if 'user_role' not in session or session['user_role'] != 'admin':
+        return jsonify({"error": "Akses ditolak"}), 403
+
+    return jsonify(database.pool.stats())
+
+@app.route('/admin/deteksi-stats')
+def admin_deteksi_stats():
+    if 'user_role' not in session or session['user_role'] != 'admin':
+        return jsonify({"error": "Akses ditolak"}), 403
+
+    return jsonify({
+        "batching": predictor.stats(),
+        "cache": deteksi_cache.stats(),
+        "jobs": deteksi_jobs.stats()
+    })
+
+@app.route('/admin/rekomendasi-stats')
+def admin_rekomendasi_stats():
+    if 'user_role' not in session or session['user_role'] != 'admin':
+        return jsonify({"error": "Akses ditolak"}), 403
+
+    return jsonify(rec_index.stats())
+
+@app.route('/admin/query-stats')
+def admin_query_stats():
+    if 'user_role' not in session or session['user_role'] != 'admin':
+        return jsonify({"error": "Akses ditolak"}), 403
+
+    return jsonify(query_tracker.stats())
+
+@app.route('/admin/model-stats')
+def admin_model_stats():
+    if 'user_role' not in session or session['user_role'] != 'admin':
+        return jsonify({"error": "Akses ditolak"}), 403
+
+    return jsonify(models.stats())
+
 @app.route('/login/admin', methods=['GET', 'POST'])
 def login_admin():
     if request.method == 'POST':
@@ -335,13 +773,30 @@ def login_admin():
 # kelola customer
 @app.route('/admin/customers')
 def kelola_customers():
-    cursor.execute("SELECT * FROM users WHERE role = 'customer'")
-    customers = cursor.fetchall()
+    after = decode_cursor(request.args.get('after'))
+    after_id = after[0] if after else 0
 
     if request.args.get('json') == 'true':
-        return jsonify(customers)
+        return Response(stream_json_array("""
+            SELECT * FROM users
+            WHERE role = 'customer' AND id_users > %s
+            ORDER BY id_users
+        """, (after_id,)), mimetype='application/json')
 
-    return render_template('admin/customers.html', customers=customers)
+    limit = parse_limit(request.args)
+    customers, next_after = keyset_page(cursor, """
+        SELECT * FROM users
+        WHERE role = 'customer' AND id_users > %s
+        ORDER BY id_users
+        LIMIT %s
+    """, (after_id,), limit, key=lambda c: (c['id_users'],))
+
+    return render_template(
+        'admin/customers.html',
+        customers=customers,
+        next_after=next_after,
+        limit=limit
+    )
 
 @app.route('/admin/customers/add', methods=['GET', 'POST'])
 def add_customer():
@@ -364,6 +819,8 @@ def add_customer():
             (username, email, password)
         )
         db.commit()
+        dashboard_stats.add_customer()
+        generations.bump('dashboard')
 
         if request.is_json:
             return jsonify({"message": "Customer berhasil ditambahkan!"}), 201
@@ -395,8 +852,12 @@ def edit_customer(id):
 
 @app.route('/admin/customers/delete/<int:id>', methods=['GET', 'DELETE'])
 def delete_customer(id):
-    cursor.execute("DELETE FROM users WHERE id_users=%s", (id,))
+    # hanya customer; admin tidak ikut terhapus (dan tidak mengurangi total_customer)
+    cursor.execute("DELETE FROM users WHERE id_users=%s AND role='customer'", (id,))
+    deleted = cursor.rowcount
     db.commit()
+    dashboard_stats.add_customer(-deleted)
+    generations.bump('dashboard')
 
     if request.method == 'DELETE':
         return jsonify({"message": "Customer berhasil dihapus!"})
@@ -407,9 +868,16 @@ def delete_customer(id):
 # kelola tukang
 @app.route('/admin/tukang')
 def kelola_tukang():
-    cursor.execute("SELECT * FROM tukang")
-    tukang = cursor.fetchall()
-    return render_template('admin/tukang.html', tukang=tukang)
+    after = decode_cursor(request.args.get('after'))
+    limit = parse_limit(request.args)
+    tukang, next_after = keyset_page(cursor, """
+        SELECT * FROM tukang
+        WHERE id_tukang > %s
+        ORDER BY id_tukang
+        LIMIT %s
+    """, (after[0] if after else 0,), limit, key=lambda t: (t['id_tukang'],))
+
+    return render_template('admin/tukang.html', tukang=tukang, next_after=next_after, limit=limit)
 
 
 @app.route('/admin/tukang/add', methods=['GET','POST'])
@@ -425,6 +893,11 @@ def add_tukang():
             VALUES (%s,%s,%s,%s,0)
         """,(nama,keahlian,pengalaman,foto))
         db.commit()
+        id_tukang = cursor.lastrowid
+        rec_index.upsert(fetch_tukang(id_tukang))
+        dashboard_stats.add_tukang()
+        generations.log('tukang', id_tukang)
+        generations.bump('dashboard')
 
         flash("Tukang berhasil ditambahkan","success")
         return redirect('/admin/tukang')
@@ -453,6 +926,9 @@ def edit_tukang(id):
             WHERE id_tukang=%s
         """,(nama,keahlian,pengalaman,foto,id))
         db.commit()
+        rec_index.upsert(fetch_tukang(id))
+        profil_cache.delete(id)
+        generations.log('tukang', id)
 
         flash("Tukang berhasil diupdate","success")
         return redirect('/admin/tukang')
@@ -463,14 +939,29 @@ def edit_tukang(id):
 @app.route('/admin/tukang/delete/<int:id>')
 def delete_tukang(id):
     cursor.execute("DELETE FROM tukang WHERE id_tukang=%s",(id,))
+    deleted = cursor.rowcount
     db.commit()
+    rec_index.delete(id)
+    profil_cache.delete(id)
+    dashboard_stats.add_tukang(-deleted)
+    generations.log('tukang', id)
+    generations.bump('dashboard')
     flash("Tukang berhasil dihapus","success")
     return redirect('/admin/tukang')
 # route review tukang 
 @app.route('/admin/review')
 def review():
-    cursor.execute("""
+    after = decode_cursor(request.args.get('after'))
+    limit = parse_limit(request.args)
+
+    where, params = "", ()
+    if after and len(after) == 2:
+        where = "WHERE r.tanggal < %s OR (r.tanggal = %s AND r.id_review < %s)"
+        params = (after[0], after[0], after[1])
+
+    reviews, next_after = keyset_page(cursor, f"""
         SELECT 
+            r.id_review,
             r.review_text,
             r.rating,
             r.sentiment,
@@ -480,11 +971,12 @@ def review():
         FROM review r
         JOIN users u ON r.user_id = u.id_users
         JOIN tukang t ON r.tukang_id = t.id_tukang
-        ORDER BY r.tanggal DESC
-    """)
-    reviews = cursor.fetchall()
+        {where}
+        ORDER BY r.tanggal DESC, r.id_review DESC
+        LIMIT %s
+    """, params, limit, key=lambda r: (r['tanggal'], r['id_review']))
 
-    return render_template('admin/review.html', reviews=reviews)
+    return render_template('admin/review.html', reviews=reviews, next_after=next_after, limit=limit)
 
 # route tampilan customer
 @app.route('/')
@@ -541,20 +1033,25 @@ def register():
             (username, email, password)
         )
         db.commit()
+        dashboard_stats.add_customer()
+        generations.bump('dashboard')
         flash("Registrasi berhasil! Silakan login.", "success")
         return redirect(url_for('login'))
 
     return render_template('register.html')
 
 @app.route('/dashboard')
+@page_cache.cached
 def dashboard():
     return render_template('dashboard.html')
 
 @app.route('/artikel-kerusakan')
+@page_cache.cached
 def artikel_kerusakan():
     return render_template('artikel-kerusakan.html')
 
 @app.route('/artikel-renovasi')
+@page_cache.cached
 def artikel_renovasi():
     return render_template('artikel-renovasi.html')
 
@@ -599,20 +1096,14 @@ def tulis_ulasan(order_id):
             VALUES (%s, %s, %s, %s, %s)
         """, (user_id, tukang_id, review_text, sentiment, rating))
 
-        cursor.execute("""
-            UPDATE tukang
-            SET 
-                rating = (
-                    SELECT IFNULL(AVG(rating), 0)
-                    FROM review WHERE tukang_id=%s
-                ),
-                jumlah_ulasan = (
-                    SELECT COUNT(*) FROM review WHERE tukang_id=%s
-                )
-            WHERE id_tukang=%s
-        """, (tukang_id, tukang_id, tukang_id))
+        ratings.apply_reviews(cursor, [(tukang_id, rating, sentiment)])
 
         db.commit()
+        rec_index.add_review(tukang_id, rating, sentiment)
+        dashboard_stats.add_reviews([rating])
+        profil_cache.delete(tukang_id)
+        generations.log('review', tukang_id, rating, sentiment == 'negatif')
+        generations.bump('dashboard')
 
         flash("Ulasan berhasil dikirim", "success")
         return redirect(url_for('riwayat_pesanan'))
@@ -632,23 +1123,24 @@ def deteksi():
             flash("Pilih gambar terlebih dahulu!", "danger")
             return redirect(url_for('deteksi'))
 
-        os.makedirs("static/uploads", exist_ok=True)
-        filepath = os.path.join("static/uploads", file.filename)
-        file.save(filepath)
+        data = file.read()
 
-        img = Image.open(filepath).convert("RGB")
-        img = img.resize((128, 128))
-        img = img_to_array(img) / 255.0
-        img = np.expand_dims(img, axis=0)
+        try:
+            upload = upload_store.put(data)
+        except uploads.InvalidImage:
+            flash("File harus berupa gambar (JPG, PNG, WEBP).", "danger")
+            return redirect(url_for('deteksi'))
 
-        pred = model.predict(img)
-        label_index = np.argmax(pred)
-        confidence = float(np.max(pred) * 100)
-        hasil = labels[label_index]
+        try:
+            hasil, confidence = deteksi_gambar(data)
+        except PredictorBusy:
+            flash("Server sedang sibuk, coba lagi beberapa saat.", "warning")
+            return redirect(url_for('deteksi'))
 
         return render_template(
             "deteksi_hasil.html",
-            gambar=file.filename,
+            gambar=upload.thumb,
+            gambar_asli=upload.path,
             hasil=hasil,
             confidence=round(confidence, 2),
             analisis=analisis_faktor.get(hasil, "Tidak ada analisis tersedia.")
@@ -690,27 +1182,49 @@ def rekomendasi():
         flash("Jenis kerusakan tidak ditemukan.", "warning")
         return redirect(url_for('dashboard'))
 
-    query_vec = vectorizer.transform([jenis_kerusakan])
-    sim_scores = cosine_similarity(query_vec, TFIDF_MATRIX).flatten()
+    limit, offset = parse_halaman(request.args)
+    with app_metrics.time_model('rekomendasi'):
+        hasil, total = models.get('rekomendasi').search(jenis_kerusakan, limit=limit, offset=offset)
 
     rekomendasi_list = []
-    for i, t in enumerate(TUKANG_DATA):
-        if sim_scores[i] >= 0.1:  
-            rekomendasi_list.append({
-                "id_tukang": t["id_tukang"],
-                "nama": t["nama"],
-                "keahlian": t["keahlian"],
-                "pengalaman": t["pengalaman"],
-                "foto": t.get("foto", "https://placehold.co/80x80"),
-                "similarity": float(sim_scores[i])
-            })
+    for h in hasil:
+        t = h.row
+        rekomendasi_list.append({
+            "id_tukang": t["id_tukang"],
+            "nama": t["nama"],
+            "keahlian": t["keahlian"],
+            "pengalaman": t["pengalaman"],
+            "foto": t.get("foto", "https://placehold.co/80x80"),
+            "rating": h.rating,
+            "similarity": h.similarity,
+            "score": h.score
+        })
 
-    rekomendasi_list = sorted(rekomendasi_list, key=lambda x: x["similarity"], reverse=True)
+    return render_template(
+        "rekomendasi.html",
+        tukangs=rekomendasi_list,
+        jenis=jenis_kerusakan,
+        total=total,
+        limit=limit,
+        offset=offset
+    )
 
-    return render_template("rekomendasi.html", tukangs=rekomendasi_list, jenis=jenis_kerusakan)
+# fragmen profil + halaman ulasan pertama per tukang, dihapus saat ada ulasan baru
+app.config['PROFIL_CACHE_SIZE'] = int(os.environ.get('PROFIL_CACHE_SIZE', 1024))
+app.config['PROFIL_CACHE_TTL'] = int(os.environ.get('PROFIL_CACHE_TTL', 60))
+app.config['ULASAN_PER_HALAMAN'] = int(os.environ.get('ULASAN_PER_HALAMAN', 10))
+profil_cache = LRUCache(maxsize=app.config['PROFIL_CACHE_SIZE'], ttl=app.config['PROFIL_CACHE_TTL'])
 
 @app.route("/lihat-tukang/<int:tukang_id>")
 def lihat_tukang(tukang_id):
+    after = decode_cursor(request.args.get('after'))
+    limit = parse_limit(request.args, default=app.config['ULASAN_PER_HALAMAN'], maximum=50)
+    halaman_pertama = not after and limit == app.config['ULASAN_PER_HALAMAN']
+
+    profil = profil_cache.get(tukang_id) if halaman_pertama else None
+    if profil is not None:
+        return render_template("lihat_tukang.html", profil=profil)
+
     cursor.execute("SELECT * FROM tukang WHERE id_tukang=%s", (tukang_id,))
     tukang = cursor.fetchone()
 
@@ -724,22 +1238,10 @@ def lihat_tukang(tukang_id):
 
     pengalaman_str = tukang.get("pengalaman", "")
     tukang["pengalaman"] = [x.strip() for x in pengalaman_str.split(",") if x.strip()]
-    cursor.execute("""
-        SELECT 
-            r.review_text,
-            r.rating,
-            r.sentiment,
-            u.username AS nama
-        FROM review r
-        JOIN users u ON r.user_id = u.id_users
-        WHERE r.tukang_id = %s
-        ORDER BY r.tanggal DESC
-    """, (tukang_id,))
-    
-    reviews = cursor.fetchall()
 
-    total_ulasan = len(reviews)
-    negatif = sum(1 for r in reviews if r["sentiment"] == "negatif")
+    # ringkasan dari counter tukang, bukan dari seluruh ulasan
+    total_ulasan = tukang["jumlah_ulasan"] or 0
+    negatif = tukang.get("jumlah_negatif") or 0
 
     persentase_negatif = 0
     if total_ulasan > 0:
@@ -747,7 +1249,28 @@ def lihat_tukang(tukang_id):
 
     tukang["persentase_negatif"] = persentase_negatif
     tukang["total_ulasan"] = total_ulasan
-   
+    tukang["distribusi"] = [(i, tukang.get(f"bintang_{i}") or 0) for i in reversed(ratings.STARS)]
+
+    where, params = "", (tukang_id,)
+    if after and len(after) == 2:
+        where = "AND (r.tanggal < %s OR (r.tanggal = %s AND r.id_review < %s))"
+        params += (after[0], after[0], after[1])
+
+    reviews, next_after = keyset_page(cursor, f"""
+        SELECT 
+            r.id_review,
+            r.tanggal,
+            r.review_text,
+            r.rating,
+            r.sentiment,
+            u.username AS nama
+        FROM review r
+        JOIN users u ON r.user_id = u.id_users
+        WHERE r.tukang_id = %s {where}
+        ORDER BY r.tanggal DESC, r.id_review DESC
+        LIMIT %s
+    """, params, limit, key=lambda r: (r['tanggal'], r['id_review']))
+
     tukang["ulasan"] = [
         {
             "nama": r["nama"],
@@ -759,7 +1282,12 @@ def lihat_tukang(tukang_id):
         for r in reviews
     ]
 
-    return render_template("lihat_tukang.html", tukang=tukang)
+    profil = Markup(render_template(
+        "_profil_tukang.html", tukang=tukang, after=after, next_after=next_after, limit=limit
+    ))
+    if halaman_pertama:
+        profil_cache.set(tukang_id, profil)
+    return render_template("lihat_tukang.html", profil=profil)
 
 @app.route("/chat")
 @login_required
@@ -789,6 +1317,55 @@ def logout():
     flash("Anda telah logout.")
     return redirect(url_for('login'))
 
+# thread background per proses. serve.py (pre-fork) menghentikannya di
+# master sebelum fork lalu menjalankannya lagi di setiap worker
+def start_background(trainer=True):
+    if rec_index.loaded:
+        rec_index.start_background()
+    if trainer and app.config['SENTIMENT_TRAIN'] == 'thread':
+        sentiment_trainer.start_background()
+
+def stop_background():
+    rec_index.stop_background()
+    sentiment_trainer.stop_background()
+
+# MODEL_WARMUP: background (default) | eager | lazy
+app.config['MODEL_WARMUP'] = os.environ.get('MODEL_WARMUP', 'background')
+
+# cek skema, thread background dan warm-up model hanya untuk proses yang
+# melayani request (python app.py, serve.py, atau request pertama), bukan
+# saat import: perintah `flask db ...` dan proses bcrypt (spawn meng-import
+# ulang __main__) tidak ikut me-load model atau query database
+_started = False
+_start_lock = threading.Lock()
+
+def startup():
+    global _started, schema_check
+    # proses hashing (spawn) meng-import ulang skrip ini sebagai __mp_main__;
+    # pool DB, thread latar dan warm-up model tidak boleh ikut jalan di sana
+    if __name__ == '__mp_main__':
+        return
+    with _start_lock:
+        if _started:
+            return
+        schema_check = migrations.check(app)
+        start_background()
+        if app.config['MODEL_WARMUP'] == 'eager':
+            models.preload()
+        elif app.config['MODEL_WARMUP'] == 'background':
+            models.warm()
+        _started = True
+    log.info("app siap dalam %.1f ms (warm-up: %s)",
+             (time.perf_counter() - _boot_start) * 1000, app.config['MODEL_WARMUP'])
+
+@app.before_request
+def startup_on_first_request():
+    if not _started:
+        startup()
+
 if __name__ == '__main__':
+    # dengan reloader (debug) yang melayani request adalah proses anak
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        startup()
     app.run(host='0.0.0.0', port=5000, debug=True)
 
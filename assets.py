@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import click
+from flask import request, url_for
+
+
+log = logging.getLogger(__name__)
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+IMAGE_EXT = (".png", ".jpg", ".jpeg")
+# tinggi (px) varian gambar; logo navbar tampil 50px, 2x untuk layar retina
+DEFAULT_HEIGHTS = (50, 100)
+# upload user tidak ikut di-build
+SKIP_DIRS = ("uploads", DIST)
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def fingerprint(name, digest, ext=None, suffix=""):
+    base, orig_ext = os.path.splitext(name)
+    return f"{base}.{digest}{suffix}{ext or orig_ext}"
+
+
+def build(static_dir, heights=DEFAULT_HEIGHTS, quality=80):
+    """Salin aset ke static/dist dengan hash isi di nama file + varian WebP.
+
+    Return manifest {nama asli: {"file", "webp", "variants": {tinggi:
+    {"webp", "file"}}}}; varian "file" (format asli) untuk browser tanpa WebP.
+    Nama file ikut berubah bila isinya berubah, jadi aman di-cache selamanya.
+    """
+    from PIL import Image
+
+    dist = os.path.join(static_dir, DIST)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+    os.makedirs(dist)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        rel_root = os.path.relpath(root, static_dir)
+        if rel_root.split(os.sep)[0] in SKIP_DIRS:
+            dirs[:] = []
+            continue
+
+        for filename in sorted(files):
+            src = os.path.join(root, filename)
+            name = os.path.normpath(os.path.join(rel_root, filename)).replace(os.sep, "/")
+            digest = file_hash(src)
+
+            target = fingerprint(name, digest)
+            os.makedirs(os.path.dirname(os.path.join(dist, target)), exist_ok=True)
+            shutil.copy2(src, os.path.join(dist, target))
+            entry = {"file": f"{DIST}/{target}"}
+
+            if filename.lower().endswith(IMAGE_EXT):
+                with Image.open(src) as im:
+                    im.load()
+                    webp = fingerprint(name, digest, ".webp")
+                    im.save(os.path.join(dist, webp), "WEBP", quality=quality, method=6)
+                    entry["webp"] = f"{DIST}/{webp}"
+
+                    entry["variants"] = {}
+                    for h in heights:
+                        if h >= im.height:
+                            continue
+                        resized = im.resize((round(im.width * h / im.height), h), Image.LANCZOS)
+                        variant_webp = fingerprint(name, digest, ".webp", f".h{h}")
+                        variant_file = fingerprint(name, digest, suffix=f".h{h}")
+                        resized.save(os.path.join(dist, variant_webp), "WEBP", quality=quality, method=6)
+                        resized.save(os.path.join(dist, variant_file), optimize=True)
+                        entry["variants"][str(h)] = {
+                            "webp": f"{DIST}/{variant_webp}",
+                            "file": f"{DIST}/{variant_file}",
+                        }
+            manifest[name] = entry
+
+    with open(os.path.join(dist, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class Assets:
+    """URL aset dari manifest build; tanpa manifest kembali ke file asli."""
+
+    def __init__(self, static_dir, max_age=31536000):
+        self.static_dir = static_dir
+        self.max_age = max_age
+        self.manifest = {}
+        self.load()
+
+    def load(self):
+        path = os.path.join(self.static_dir, DIST, MANIFEST)
+        try:
+            with open(path) as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {}
+            log.info("manifest aset belum ada; jalankan `flask assets build`")
+        return self.manifest
+
+    def url(self, filename, height=None, webp=False):
+        entry = self.manifest.get(filename)
+        if entry is None:
+            return url_for("static", filename=filename)
+
+        kind = "webp" if webp and "webp" in entry else "file"
+        target = entry[kind]
+        if height is not None:
+            # varian terkecil yang masih setinggi yang diminta
+            for h in sorted(entry.get("variants", {}), key=int):
+                if int(h) >= height:
+                    target = entry["variants"][h][kind]
+                    break
+        return url_for("static", filename=target)
+
+    def srcset(self, filename, height):
+        """srcset 1x/2x WebP untuk gambar yang tampil setinggi `height` px."""
+        entry = self.manifest.get(filename)
+        if not entry or not entry.get("webp"):
+            return ""
+        return ", ".join(
+            f"{self.url(filename, height=h * height, webp=True)} {h}x" for h in (1, 2)
+        )
+
+
+def init_app(app, assets):
+    app.jinja_env.globals["asset_url"] = assets.url
+    app.jinja_env.globals["asset_srcset"] = assets.srcset
+
+    @app.after_request
+    def immutable_assets(response):
+        # file di static/dist punya hash isi di namanya
+        if request.endpoint == "static" and request.path.startswith(f"/static/{DIST}/"):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = assets.max_age
+            response.cache_control.immutable = True
+        return response
+
+    @app.cli.group("assets")
+    def assets_command():
+        """Build aset statis."""
+
+    @assets_command.command("build")
+    @click.option("--quality", default=80, help="Kualitas WebP (0-100).")
+    def build_command(quality):
+        """Fingerprint file di static/ dan buat varian WebP gambar."""
+        manifest = build(assets.static_dir, quality=quality)
+        assets.load()
+        for name, entry in sorted(manifest.items()):
+            original = os.path.getsize(os.path.join(assets.static_dir, name))
+            sizes = [f"{os.path.basename(entry['file'])}"]
+            paths = [entry.get("webp")]
+            for variant in entry.get("variants", {}).values():
+                paths += [variant["webp"], variant["file"]]
+            for path in paths:
+                if path:
+                    size = os.path.getsize(os.path.join(assets.static_dir, path))
+                    sizes.append(f"{os.path.basename(path)} {size / 1024:.1f} KB")
+            click.echo(f"{name} ({original / 1024:.1f} KB): " + ", ".join(sizes))
@@ -0,0 +1,96 @@
+"""Backend inference untuk model CNN deteksi kerusakan.
+
+Semua backend punya method `predict(batch)` dengan input array float32
+(n, 128, 128, 3) bernilai 0..1 dan output probabilitas (n, jumlah_label).
+"""
+import os
+
+import numpy as np
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(path)
+
+    def predict(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+
+class TFLiteBackend:
+    """Model hasil konversi TFLite (float32, float16 atau int8)."""
+
+    name = "tflite"
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+
+    def _quantize(self, x):
+        scale, zero_point = self.input["quantization"]
+        if self.input["dtype"] in (np.int8, np.uint8) and scale:
+            info = np.iinfo(self.input["dtype"])
+            x = np.clip(np.round(x / scale + zero_point), info.min, info.max)
+        return x.astype(self.input["dtype"])
+
+    def _dequantize(self, y):
+        scale, zero_point = self.output["quantization"]
+        if self.output["dtype"] in (np.int8, np.uint8) and scale:
+            return (y.astype(np.float32) - zero_point) * scale
+        return y
+
+    def predict(self, batch):
+        # input tensor dibuat untuk batch 1; invoke per gambar lebih murah
+        # daripada resize_tensor_input + allocate_tensors setiap batch
+        hasil = []
+        for img in batch:
+            self.interpreter.set_tensor(self.input["index"], self._quantize(img[None, ...]))
+            self.interpreter.invoke()
+            hasil.append(self._dequantize(self.interpreter.get_tensor(self.output["index"]))[0])
+        return np.stack(hasil)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch):
+        return self.session.run(None, {self.input_name: batch.astype(np.float32)})[0]
+
+
+BACKENDS = {
+    "keras": (KerasBackend, "model/model_temantukang.keras"),
+    "tflite": (TFLiteBackend, "model/model_temantukang.tflite"),
+    "onnx": (OnnxBackend, "model/model_temantukang.onnx"),
+}
+
+
+def make_backend(name, path=None, num_threads=None):
+    if name not in BACKENDS:
+        raise ValueError(f"Backend inference tidak dikenal: {name}")
+
+    cls, default_path = BACKENDS[name]
+    path = path or default_path
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File model untuk backend {name} tidak ada: {path}")
+
+    if cls is KerasBackend:
+        return cls(path)
+    return cls(path, num_threads=num_threads)
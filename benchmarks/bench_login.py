@@ -0,0 +1,56 @@
+"""Benchmark throughput verifikasi bcrypt (login) terhadap jumlah worker pool.
+
+workers=0 berarti bcrypt dijalankan langsung di thread request (cara lama).
+
+    python benchmarks/bench_login.py --workers 0 1 2 4 --logins 64 --rounds 10
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hashing import PasswordHasher  # noqa: E402
+
+
+def run(workers, rounds, logins, concurrency):
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=logins)
+    pw_hash = PasswordHasher(rounds=rounds, workers=0).hash("rahasia123")
+
+    # pemanasan: proses worker di-spawn di luar pengukuran
+    hasher.check(pw_hash, "rahasia123")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ok = list(pool.map(lambda _: hasher.check(pw_hash, "rahasia123"), range(logins)))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+
+    assert all(ok)
+    return {
+        "workers": workers,
+        "rounds": rounds,
+        "logins": logins,
+        "seconds": round(elapsed, 3),
+        "logins_per_sec": round(logins / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="jumlah thread request yang login bersamaan")
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        print(json.dumps(run(workers, args.rounds, args.logins, args.concurrency)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
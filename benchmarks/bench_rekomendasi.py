@@ -0,0 +1,96 @@
+"""Benchmark latency /rekomendasi terhadap jumlah tukang.
+
+Membandingkan cara lama (cosine_similarity ke semua tukang + loop Python)
+dengan inverted index + top-k di `rekomendasi.RecommendationIndex`.
+
+    python benchmarks/bench_rekomendasi.py --sizes 1000 10000 100000 500000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rekomendasi import RecommendationIndex  # noqa: E402
+
+
+LABELS = ["Retak Dinding", "Plafon Rusak", "Keramik Rusak", "Cat Mengelupas",
+          "Kayu Kusen Lapuk", "Dinding Berjamur"]
+
+KATA = ["dinding", "plafon", "keramik", "cat", "kayu", "kusen", "atap", "pipa",
+        "listrik", "lantai", "jamur", "retak", "bocor", "plester", "gypsum",
+        "las", "pagar", "taman", "kaca", "pintu", "jendela", "sumur", "septic",
+        "renovasi", "bangunan", "beton", "besi", "baja", "genteng", "talang"]
+
+
+def synthetic_tukang(n, seed=42):
+    rnd = random.Random(seed)
+    # sebagian besar tukang punya kosakata spesialis sendiri, sehingga
+    # satu query hanya mengenai sebagian kecil katalog
+    rows = []
+    for i in range(n):
+        keahlian = " ".join(rnd.sample(KATA, 2)) + f" spesialis{i % 5000}"
+        pengalaman = f"{rnd.randint(1, 30)} tahun, proyek{i % 997}"
+        rows.append({"id_tukang": i + 1, "nama": f"Tukang {i + 1}",
+                     "keahlian": keahlian, "pengalaman": pengalaman, "rating": 0})
+    return rows
+
+
+def full_scan(snap, rows, text):
+    q = snap.vectorizer.transform([text])
+    sims = cosine_similarity(q, snap.base_matrix).flatten()
+    hasil = [(t, float(sims[i])) for i, t in enumerate(rows) if sims[i] >= 0.1]
+    return sorted(hasil, key=lambda x: x[1], reverse=True)
+
+
+def timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 50000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    report = []
+    for n in args.sizes:
+        rows = synthetic_tukang(n)
+        index = RecommendationIndex(lambda: rows)
+        index.refit()
+        snap = index.snapshot
+
+        for label in LABELS:
+            hasil, total = snap.search(label, limit=args.limit)
+            lama = full_scan(snap, rows, label)
+            assert total == len(lama)
+            assert np.allclose([h.similarity for h in hasil], [s for _, s in lama[:args.limit]])
+
+        full_ms = np.mean([timeit(lambda: full_scan(snap, rows, lb), args.repeat) for lb in LABELS])
+        index_ms = np.mean([timeit(lambda: snap.search(lb, limit=args.limit), args.repeat) for lb in LABELS])
+        report.append({
+            "tukang": n,
+            "full_scan_ms": round(full_ms, 3),
+            "inverted_index_ms": round(index_ms, 3),
+            "speedup": round(full_ms / index_ms, 1) if index_ms else None,
+        })
+        print(json.dumps(report[-1]), flush=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Benchmark model sentiment: pickle TF-IDF + SVM lama vs model online.
+
+Model online dilatih lewat `sentiment.SentimentTrainer` (batch, checkpoint,
+hot-swap), lalu keduanya diukur pada data uji yang sama: akurasi,
+throughput prediksi (1 teks dan batch) dan memori puncak selama training.
+Label diturunkan dari bintang (`sentiment.label_from_rating`).
+
+Data sintetis memakai kosakata sendiri sehingga akurasinya menguntungkan
+model online; untuk perbandingan yang adil pakai ekspor tabel review
+(kolom review_text, rating, urut id_review). 20% review terbaru jadi data uji.
+
+    python benchmarks/bench_sentiment.py --reviews 10000 100000
+    python benchmarks/bench_sentiment.py --csv review.csv
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sentiment  # noqa: E402
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+POSITIF = ["rapi", "cepat", "tepat waktu", "amanah", "profesional", "puas", "mantap",
+           "bagus", "sesuai", "ramah", "responsif", "bersih", "terima kasih", "rekomendasi"]
+NEGATIF = ["lambat", "kecewa", "buruk", "rugi", "mahal", "terlambat", "berantakan",
+           "bocor lagi", "tidak rapi", "kurang rapi", "tidak puas", "tidak sesuai",
+           "tidak tepat waktu", "kurang responsif"]
+KATA = ["tukang", "kerja", "hasil", "pengerjaan", "atap", "dinding", "keramik", "cat",
+        "plafon", "renovasi", "rumah", "harga", "datang", "pelayanan", "sangat", "nya"]
+
+
+def synthetic_reviews(n, seed=42, noise=0.05):
+    """(id_review, teks, bintang); sebagian bintang 3 (campuran)."""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        positif = rnd.random() < 0.7
+        words = rnd.sample(KATA, 3) + rnd.sample(POSITIF if positif else NEGATIF, 2)
+        # ulasan campuran: kadang ada kata dari sisi lain
+        if rnd.random() < 0.2:
+            words.append(rnd.choice(NEGATIF if positif else POSITIF))
+        rnd.shuffle(words)
+        rating = rnd.randint(4, 5) if positif else rnd.randint(1, 2)
+        if rnd.random() < 0.1:
+            rating = 3
+        elif rnd.random() < noise:
+            rating = 6 - rating
+        rows.append((i + 1, " ".join(words), rating))
+    return rows
+
+
+def csv_reviews(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(i + 1, r["review_text"], int(r["rating"]))
+                for i, r in enumerate(csv.DictReader(f))]
+
+
+def split(rows, test_ratio=0.2):
+    cut = int(len(rows) * (1 - test_ratio))
+    test = [(r[1], sentiment.label_from_rating(r[2])) for r in rows[cut:]]
+    return rows[:cut], [t for t in test if t[1] is not None]
+
+
+def load_pickles():
+    import joblib
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        tfidf = joblib.load(os.path.join(ROOT, "model/tfidf_vectorizer.pkl"))
+        svm = joblib.load(os.path.join(ROOT, "model/svm_model.pkl"))
+    return lambda texts: svm.predict(tfidf.transform(texts))
+
+
+def throughput(predict, texts, batch):
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch):
+        predict(texts[i:i + batch])
+    return len(texts) / (time.perf_counter() - start)
+
+
+def train_online(rows, batch_size):
+    def fetch(after_id, limit):
+        # id_review = posisi + 1, sama seperti keyset di TRAIN_SQL
+        return rows[after_id:after_id + limit]
+
+    directory = tempfile.mkdtemp(prefix="sentiment-bench-")
+    store = sentiment.CheckpointStore(directory)
+    online = sentiment.OnlineSentiment(store, reload_interval=0, min_samples=0)
+    trainer = sentiment.SentimentTrainer(store, fetch=fetch, batch_size=batch_size,
+                                         on_checkpoint=lambda v: online.reload())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    # checkpoint tiap 20 batch, seperti trainer yang berjalan berkala
+    while trainer.run_once(max_batches=20) is not None:
+        pass
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    checkpoint = os.path.getsize(store.path(store.latest_version()))
+    return online, {
+        "train_rows_per_s": round(len(rows) / elapsed),
+        "train_peak_mb": round(peak / 1024 / 1024, 1),
+        "checkpoint_kb": round(checkpoint / 1024, 1),
+        "versions": store.latest_version(),
+        "hot_swaps": online.reloads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--csv", help="Ekspor tabel review (review_text, rating).")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--predict-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    lama = load_pickles()
+    datasets = [csv_reviews(args.csv)] if args.csv else [synthetic_reviews(n) for n in args.reviews]
+
+    report = []
+    for rows in datasets:
+        train_rows, test = split(rows)
+        test_texts = [t[0] for t in test]
+        truth = np.array([t[1] for t in test])
+        single = test_texts[:1000]
+
+        online, train = train_online(train_rows, args.batch_size)
+        baru = online.current().predict
+        lama_pred = lama(test_texts)
+        report.append({
+            "reviews": len(rows),
+            "test": len(test),
+            "svm_accuracy": round(float((lama_pred == truth).mean()), 4),
+            "online_accuracy": round(float((baru(test_texts) == truth).mean()), 4),
+            "agreement": round(float((baru(test_texts) == lama_pred).mean()), 4),
+            "svm_pred_per_s_single": round(throughput(lama, single, 1)),
+            "online_pred_per_s_single": round(throughput(baru, single, 1)),
+            "svm_pred_per_s_batch": round(throughput(lama, test_texts, args.predict_batch)),
+            "online_pred_per_s_batch": round(throughput(baru, test_texts, args.predict_batch)),
+            **train,
+        })
+        print(json.dumps(report[-1]), flush=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Benchmark end-to-end jalur utama app.py dengan database dan model pengganti.
+
+Database MySQL diganti SQLite (lihat standin.py) yang diisi data sintetis,
+model CNN/SVM diganti model kecil, dan login Google memakai key lokal.
+Setiap skenario dijalankan lewat Flask test client oleh beberapa thread
+bersamaan; hasilnya p50/p95/p99 latency dan throughput dalam JSON.
+
+    python benchmarks/run_benchmarks.py --tukang 5000 --reviews 50000 --output hasil.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --fail-on-regression
+    QUERY_BUDGETS=add_review=3 python benchmarks/run_benchmarks.py --strict-queries
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import standin  # noqa: E402
+
+PASSWORD = "rahasia123"
+LABELS = ["Retak Dinding", "Plafon Rusak", "Keramik Rusak", "Cat Mengelupas",
+          "Kayu Kusen Lapuk", "Dinding Berjamur"]
+
+
+def setup_app(args, workdir, upload_dir):
+    """Import app.py dengan semua dependensi eksternal diganti versi lokal."""
+    from hashing import _hash
+
+    os.environ["MODEL_WARMUP"] = "lazy"
+    # skema stand-in dibuat oleh standin.seed, bukan migrasi MySQL
+    os.environ["DB_SCHEMA_CHECK"] = "off"
+    os.environ["BCRYPT_LOG_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    db_path = os.path.join(workdir, "capstone_web.sqlite")
+    standin.seed(db_path, tukang=args.tukang, users=args.users, reviews=args.reviews,
+                 password_hash=_hash(PASSWORD, args.bcrypt_rounds))
+
+    # upload deteksi ke direktori sementara (harus di dalam static), bukan static/uploads
+    os.environ["UPLOAD_DIR"] = upload_dir
+    os.chdir(workdir)
+
+    import app as capstone
+    import database
+    from google_auth import GoogleTokenVerifier, StaticCertSource
+
+    database.pool = standin.SQLitePool(db_path, size=args.concurrency + 2)
+
+    tfidf, svm = standin.standin_sentiment()
+    capstone.models.register("cnn", standin.StandInCNN)
+    capstone.models.register("svm", lambda: svm)
+    capstone.models.register("tfidf", lambda: tfidf)
+
+    google = standin.GoogleStandIn(capstone.GOOGLE_CLIENT_ID)
+    capstone.google_verifier = GoogleTokenVerifier(
+        capstone.GOOGLE_CLIENT_ID, StaticCertSource(google.certs)
+    )
+
+    capstone.app.config["TESTING"] = True
+    capstone.models.preload()
+    return capstone, google
+
+
+def random_jpeg(rnd, size=(640, 480)):
+    arr = rnd.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(arr).save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+def build_scenarios(capstone, google, args):
+    app = capstone.app
+    rnd = random.Random(7)
+    with app.app_context():
+        token = capstone.create_access_token(identity="1")
+    auth = {"Authorization": f"Bearer {token}"}
+
+    images = [random_jpeg(np.random.default_rng(i)) for i in range(args.requests + args.warmup)]
+    image_counter = iter(range(10 ** 9))
+    image_lock = threading.Lock()
+
+    def next_image():
+        with image_lock:
+            return images[next(image_counter) % len(images)]
+
+    google_tokens = [google.token(f"g{i}", f"g{i}@contoh.id") for i in range(50)]
+
+    def as_customer(client):
+        with client.session_transaction() as sess:
+            sess["user_id"] = 1
+            sess["user_role"] = "customer"
+
+    def as_admin(client):
+        with client.session_transaction() as sess:
+            sess["user_id"] = args.users + 1
+            sess["user_role"] = "admin"
+
+    def predict_sentiment(client, i):
+        capstone.predict_sentiment(rnd.choice(standin.POSITIF + standin.NEGATIF))
+
+    def api_review(client, i):
+        return client.post("/api/review", headers=auth, json={
+            "tukang_id": rnd.randint(1, args.tukang),
+            "review_text": rnd.choice(standin.POSITIF + standin.NEGATIF),
+            "rating": rnd.randint(1, 5),
+        })
+
+    def rekomendasi_label(client, i):
+        return client.get("/rekomendasi", query_string={"jenis": rnd.choice(LABELS)})
+
+    def rekomendasi_acak(client, i):
+        jenis = " ".join(rnd.sample(standin.KATA, 2))
+        return client.get("/rekomendasi", query_string={"jenis": jenis, "offset": rnd.randint(0, 3) * 20})
+
+    def api_rekomendasi(client, i):
+        return client.post("/api/rekomendasi", headers=auth,
+                           json={"jenis_kerusakan": " ".join(rnd.sample(standin.KATA, 2))})
+
+    def lihat_tukang(client, i):
+        return client.get(f"/lihat-tukang/{rnd.randint(1, args.tukang)}")
+
+    def deteksi(client, i):
+        return client.post("/deteksi", content_type="multipart/form-data",
+                           data={"file": (io.BytesIO(next_image()), f"bench{i}.jpg")})
+
+    def admin_dashboard(client, i):
+        return client.get("/admin")
+
+    def login_api(client, i):
+        return client.post("/api/login", json={
+            "email": f"user{rnd.randint(0, args.users - 1)}@contoh.id", "password": PASSWORD,
+        })
+
+    def login_google(client, i):
+        return client.post("/api/auth/google", json={"id_token": rnd.choice(google_tokens)})
+
+    return {
+        "predict_sentiment": (predict_sentiment, None),
+        "api_review": (api_review, None),
+        "rekomendasi_label": (rekomendasi_label, None),
+        "rekomendasi_acak": (rekomendasi_acak, None),
+        "api_rekomendasi": (api_rekomendasi, None),
+        "lihat_tukang": (lihat_tukang, None),
+        "deteksi": (deteksi, as_customer),
+        "admin_dashboard": (admin_dashboard, as_admin),
+        "login_api": (login_api, None),
+        "login_google": (login_google, None),
+    }
+
+
+def percentile(values, p):
+    return round(float(np.percentile(values, p)), 3) if values else None
+
+
+def total_queries(tracker):
+    return sum(s["queries"] for s in tracker.stats().values())
+
+
+def run_scenario(app, tracker, fn, prepare, requests, concurrency, warmup):
+    from querylog import QueryBudgetExceeded
+
+    local = threading.local()
+    violations = []
+
+    def client():
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+            if prepare:
+                prepare(local.client)
+        return local.client
+
+    def call(i):
+        start = time.perf_counter()
+        try:
+            resp = fn(client(), i)
+            ok = resp is None or resp.status_code < 400
+        except QueryBudgetExceeded as e:
+            violations.append(str(e))
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        return elapsed, ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(warmup)))
+        violations.clear()
+
+        queries_before = total_queries(tracker)
+        start = time.perf_counter()
+        results = list(pool.map(call, range(requests)))
+        wall = time.perf_counter() - start
+        queries = total_queries(tracker) - queries_before
+
+    latencies = [r[0] for r in results]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(1 for r in results if not r[1]),
+        "mean_ms": round(float(np.mean(latencies)), 3),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "throughput_rps": round(requests / wall, 1),
+        "queries_per_request": round(queries / requests, 2),
+        "query_budget_violations": sorted(set(violations))[:5],
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Skenario yang p95-nya naik atau throughput-nya turun lebih dari toleransi."""
+    regressions = []
+    for name, now in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {now['p95_ms']} ms")
+        if before["throughput_rps"] and now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {now['throughput_rps']} rps")
+        # jumlah query deterministik: naik sedikit pun dianggap regresi
+        if now.get("queries_per_request", 0) > before.get("queries_per_request", float("inf")) + 0.01:
+            regressions.append(f"{name}: query/request {before['queries_per_request']} -> {now['queries_per_request']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tukang", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200, help="request per skenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+", help="default: semua skenario")
+    parser.add_argument("--output", help="simpan laporan JSON ke file ini")
+    parser.add_argument("--baseline", help="laporan JSON pembanding")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--strict-queries", action="store_true",
+                        help="gagal bila ada request melewati budget query (QUERY_BUDGET*)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    with tempfile.TemporaryDirectory(prefix="capstone-bench-") as workdir, \
+            tempfile.TemporaryDirectory(prefix="bench-uploads-", dir=os.path.join(ROOT, "static")) as upload_dir:
+        capstone, google = setup_app(args, workdir, upload_dir)
+        capstone.query_tracker.strict = args.strict_queries
+        scenarios = build_scenarios(capstone, google, args)
+
+        report = {
+            "meta": {
+                "tukang": args.tukang, "users": args.users, "reviews": args.reviews,
+                "python": platform.python_version(), "cpus": os.cpu_count(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "scenarios": {},
+        }
+        for name in args.scenarios or list(scenarios):
+            fn, prepare = scenarios[name]
+            result = run_scenario(capstone.app, capstone.query_tracker, fn, prepare,
+                                  args.requests, args.concurrency, args.warmup)
+            report["scenarios"][name] = result
+            print(json.dumps({name: result}), file=sys.stderr, flush=True)
+
+    print(json.dumps(report, indent=2))
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print("REGRESI:", r, file=sys.stderr)
+        failed = bool(regressions) and args.fail_on_regression
+
+    for name, result in report["scenarios"].items():
+        for v in result["query_budget_violations"]:
+            print("BUDGET QUERY:", v, file=sys.stderr)
+            failed = failed or args.strict_queries
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Pengganti lokal untuk benchmark offline: database SQLite, model, dan key Google.
+
+`SQLitePool` meniru API `database.ConnectionPool` (acquire/release/
+connection/stats) dan cursor mysql.connector (`%s`, dictionary=True),
+sehingga route di app.py bisa dijalankan tanpa server MySQL.
+"""
+import datetime
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+SCHEMA = """
+CREATE TABLE users (
+    id_users INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT,
+    email TEXT,
+    password TEXT,
+    role TEXT,
+    auth_provider TEXT DEFAULT 'local',
+    google_id TEXT
+);
+CREATE INDEX idx_users_email ON users(email);
+CREATE INDEX idx_users_google ON users(google_id);
+
+CREATE TABLE tukang (
+    id_tukang INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama TEXT,
+    keahlian TEXT,
+    pengalaman TEXT,
+    foto TEXT,
+    rating REAL DEFAULT 0,
+    jumlah_ulasan INTEGER DEFAULT 0,
+    rating_sum INTEGER DEFAULT 0,
+    jumlah_negatif INTEGER DEFAULT 0,
+    bintang_1 INTEGER DEFAULT 0,
+    bintang_2 INTEGER DEFAULT 0,
+    bintang_3 INTEGER DEFAULT 0,
+    bintang_4 INTEGER DEFAULT 0,
+    bintang_5 INTEGER DEFAULT 0
+);
+
+CREATE TABLE review (
+    id_review INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    tukang_id INTEGER,
+    review_text TEXT,
+    sentiment TEXT,
+    rating INTEGER,
+    tanggal TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_review_tukang ON review(tukang_id, tanggal);
+CREATE INDEX idx_review_tanggal ON review(tanggal, id_review);
+CREATE INDEX idx_review_rating ON review(rating);
+
+CREATE TABLE orders (
+    id_order INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    tukang_id INTEGER
+);
+"""
+
+
+class SQLiteCursor:
+    def __init__(self, conn, dictionary=False):
+        self._cur = conn.cursor()
+        self.dictionary = dictionary
+
+    @staticmethod
+    def _sql(sql):
+        return sql.replace("%s", "?")
+
+    def execute(self, sql, params=()):
+        self._cur.execute(self._sql(sql), tuple(params or ()))
+
+    def executemany(self, sql, seq):
+        self._cur.executemany(self._sql(sql), [tuple(p) for p in seq])
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return {d[0]: v for d, v in zip(self._cur.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    def fetchmany(self, size):
+        return [self._row(r) for r in self._cur.fetchmany(size)]
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    def close(self):
+        self._cur.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def cursor(self, dictionary=False, buffered=True):
+        return SQLiteCursor(self._conn, dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+
+class SQLitePool:
+    def __init__(self, path, size=8):
+        self.path = path
+        self.size = size
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(SQLiteConnection(path))
+        self._lock = threading.Lock()
+        self._stats = {"checkouts": 0, "in_use": 0, "wait_total_ms": 0.0}
+
+    def acquire(self):
+        start = time.perf_counter()
+        conn = self._idle.get(timeout=30)
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["wait_total_ms"] += (time.perf_counter() - start) * 1000
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._stats["in_use"] -= 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        s["size"] = self.size
+        return s
+
+
+KATA = ["dinding", "plafon", "keramik", "cat", "kayu", "kusen", "atap", "pipa",
+        "listrik", "lantai", "jamur", "retak", "bocor", "plester", "gypsum",
+        "pintu", "jendela", "beton", "genteng", "talang"]
+POSITIF = ["kerja rapi dan cepat", "hasil bagus sekali", "tukang ramah dan tepat waktu",
+           "sangat puas dengan hasilnya", "harga sesuai dan rapi"]
+NEGATIF = ["kerja lambat dan berantakan", "hasil jelek tidak rapi", "datang terlambat terus",
+           "kecewa dengan hasilnya", "mahal dan tidak rapi"]
+
+
+def seed(path, tukang=1000, users=1000, reviews=10000, password_hash=None, seed=42):
+    """Buat database SQLite baru berisi data sintetis."""
+    if os.path.exists(path):
+        os.remove(path)
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+
+    conn.executemany(
+        "INSERT INTO users (username, email, password, role, auth_provider) VALUES (?,?,?,?,?)",
+        [(f"user{i}", f"user{i}@contoh.id", password_hash or "rahasia", "customer", "local")
+         for i in range(users)]
+        + [("admin", "admin@contoh.id", "admin123", "admin", "local")]
+    )
+    conn.executemany(
+        "INSERT INTO tukang (nama, keahlian, pengalaman, foto) VALUES (?,?,?,?)",
+        [(f"Tukang {i}", " ".join(rnd.sample(KATA, 3)),
+          f"{rnd.randint(1, 30)} tahun, {rnd.choice(KATA)}", "https://placehold.co/80x80")
+         for i in range(tukang)]
+    )
+
+    start = datetime.datetime(2024, 1, 1)
+    rows = []
+    for i in range(reviews):
+        positif = rnd.random() < 0.75
+        rows.append((
+            rnd.randint(1, users), rnd.randint(1, tukang),
+            rnd.choice(POSITIF if positif else NEGATIF),
+            "positif" if positif else "negatif",
+            rnd.randint(3, 5) if positif else rnd.randint(1, 3),
+            (start + datetime.timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+    conn.executemany(
+        "INSERT INTO review (user_id, tukang_id, review_text, sentiment, rating, tanggal) VALUES (?,?,?,?,?,?)",
+        rows
+    )
+    conn.execute("""
+        UPDATE tukang SET
+            rating_sum = IFNULL((SELECT SUM(rating) FROM review WHERE tukang_id = id_tukang), 0),
+            jumlah_ulasan = (SELECT COUNT(*) FROM review WHERE tukang_id = id_tukang),
+            jumlah_negatif = (SELECT COUNT(*) FROM review
+                              WHERE tukang_id = id_tukang AND sentiment = 'negatif')
+    """)
+    for i in range(1, 6):
+        conn.execute(f"""
+            UPDATE tukang SET bintang_{i} =
+                (SELECT COUNT(*) FROM review WHERE tukang_id = id_tukang AND rating = {i})
+        """)
+    conn.execute("""
+        UPDATE tukang SET rating = CASE WHEN jumlah_ulasan > 0
+            THEN rating_sum * 1.0 / jumlah_ulasan ELSE 0 END
+    """)
+    conn.executemany(
+        "INSERT INTO orders (user_id, tukang_id) VALUES (?,?)",
+        [(rnd.randint(1, users), rnd.randint(1, tukang)) for _ in range(max(users // 10, 1))]
+    )
+    conn.commit()
+    conn.close()
+
+
+class StandInCNN:
+    """Pengganti CNN: proyeksi acak + softmax, biaya sebanding model kecil."""
+
+    def __init__(self, n_labels=6, seed=0):
+        rng = np.random.default_rng(seed)
+        self.w = rng.standard_normal((128 * 128 * 3, n_labels)).astype(np.float32) * 0.01
+
+    def predict(self, batch):
+        logits = batch.reshape(len(batch), -1) @ self.w
+        e = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+
+def standin_sentiment():
+    """Pasangan (tfidf, svm) kecil yang dilatih dari kalimat sintetis."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+
+    texts = POSITIF * 20 + NEGATIF * 20
+    y = [1] * (len(POSITIF) * 20) + [0] * (len(NEGATIF) * 20)
+    tfidf = TfidfVectorizer()
+    svm = LinearSVC().fit(tfidf.fit_transform(texts), y)
+    return tfidf, svm
+
+
+class GoogleStandIn:
+    """Key RSA lokal + sertifikat self-signed untuk menandatangani id_token uji."""
+
+    def __init__(self, client_id, kid="standin"):
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.x509.oid import NameOID
+        from google.auth import crypt
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "standin")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder()
+                .subject_name(name).issuer_name(name)
+                .public_key(key.public_key())
+                .serial_number(1)
+                .not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=1))
+                .sign(key, hashes.SHA256()))
+
+        self.client_id = client_id
+        self.certs = {kid: cert.public_bytes(serialization.Encoding.PEM).decode()}
+        pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption())
+        self.signer = crypt.RSASigner.from_string(pem, key_id=kid)
+
+    def token(self, sub, email):
+        from google.auth import jwt
+
+        now = int(time.time())
+        return jwt.encode(self.signer, {
+            "iss": "https://accounts.google.com", "aud": self.client_id,
+            "sub": sub, "email": email, "iat": now, "exp": now + 3600,
+        }).decode()
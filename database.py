@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import pooling
+from flask import g
+from werkzeug.local import LocalProxy
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Pool koneksi MySQL: satu koneksi dipinjam per request lalu dikembalikan."""
+
+    def __init__(self, size=10, timeout=5.0, **db_config):
+        self.size = size
+        self.timeout = timeout
+        self.db_config = db_config
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._connection_ids = set()
+        self._stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "max_in_use": 0,
+            "timeouts": 0,
+            "reconnects": 0,
+            "wait_total_ms": 0.0,
+            "wait_max_ms": 0.0,
+        }
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # koneksi (socket) milik proses induk tidak boleh dipakai bersama;
+        # worker membuat pool sendiri saat pertama dipakai
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._connection_ids = set()
+        self._stats["in_use"] = 0
+
+    def reset(self):
+        """Tutup koneksi idle di pool; dipanggil di proses master sebelum fork."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool._remove_connections()
+                self._pool = None
+                self._connection_ids = set()
+
+    def _get_pool(self):
+        # dibuat saat pertama dipakai, supaya aman setelah fork
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name="capstone_web",
+                        pool_size=self.size,
+                        pool_reset_session=True,
+                        **self.db_config
+                    )
+        return self._pool
+
+    def acquire(self):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout("Tidak ada koneksi database yang tersedia")
+
+        try:
+            # get_connection() sudah mem-ping koneksi (is_connected) dan
+            # menyambung ulang bila diputus MySQL (wait_timeout); tidak perlu
+            # ping lagi di sini
+            conn = self._get_pool().get_connection()
+            connection_id = conn.connection_id
+        except Exception:
+            self._slots.release()
+            raise
+
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            s = self._stats
+            # pool membuka `size` koneksi di awal; connection id baru setelah
+            # itu berarti koneksi disambung ulang (di get_connection/release)
+            if connection_id not in self._connection_ids:
+                self._connection_ids.add(connection_id)
+                if len(self._connection_ids) > self.size:
+                    s["reconnects"] += 1
+            s["checkouts"] += 1
+            s["in_use"] += 1
+            s["max_in_use"] = max(s["max_in_use"], s["in_use"])
+            s["wait_total_ms"] += wait_ms
+            s["wait_max_ms"] = max(s["wait_max_ms"], wait_ms)
+        return conn
+
+    def release(self, conn):
+        try:
+            if conn.unread_result:
+                # sisa hasil cursor unbuffered: sambung ulang daripada membaca semuanya
+                conn.reconnect(attempts=1, delay=0)
+            elif conn.in_transaction:
+                conn.rollback()
+            conn.close()  # pooled connection: close() mengembalikan ke pool
+        except mysql.connector.Error:
+            pass
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Koneksi di luar request (startup, CLI, thread background)."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        s["size"] = self.size
+        s["available"] = self.size - s["in_use"]
+        s["wait_avg_ms"] = round(s["wait_total_ms"] / s["checkouts"], 3) if s["checkouts"] else 0.0
+        return s
+
+
+class TrackedCursor:
+    """Cursor per request yang mencatat durasi setiap query ke listener."""
+
+    def __init__(self, cursor, listeners):
+        self._cursor = cursor
+        self._listeners = listeners
+
+    def execute(self, sql, params=None):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params)
+        finally:
+            elapsed = time.perf_counter() - start
+            for fn in self._listeners:
+                fn(sql, params, elapsed)
+
+    def executemany(self, sql, seq_params):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_params)
+        finally:
+            elapsed = time.perf_counter() - start
+            for fn in self._listeners:
+                fn(sql, None, elapsed)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+pool = None
+# fn(sql, params, detik) dipanggil setelah setiap query di cursor request
+query_listeners = []
+
+
+def on_query(fn):
+    query_listeners.append(fn)
+    return fn
+
+
+def init_app(app):
+    global pool
+    pool = ConnectionPool(
+        size=app.config.get("DB_POOL_SIZE", 10),
+        timeout=app.config.get("DB_POOL_TIMEOUT", 5.0),
+        host=app.config.get("DB_HOST", "localhost"),
+        user=app.config.get("DB_USER", "root"),
+        password=app.config.get("DB_PASSWORD", ""),
+        database=app.config.get("DB_NAME", "capstone_web"),
+    )
+    app.teardown_appcontext(close_db)
+    return pool
+
+
+def get_db():
+    if "db_conn" not in g:
+        g.db_conn = pool.acquire()
+    return g.db_conn
+
+
+def get_cursor():
+    if "db_cursor" not in g:
+        cur = get_db().cursor(dictionary=True, buffered=True)
+        g.db_cursor = TrackedCursor(cur, query_listeners) if query_listeners else cur
+    return g.db_cursor
+
+
+def close_db(exc=None):
+    cur = g.pop("db_cursor", None)
+    if cur is not None:
+        try:
+            cur.close()
+        except mysql.connector.Error:
+            pass
+
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        pool.release(conn)
+
+
+# proxy per-request, dipakai route seperti objek global sebelumnya
+db = LocalProxy(get_db)
+cursor = LocalProxy(get_cursor)
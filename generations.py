@@ -0,0 +1,131 @@
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+
+SLOT = struct.Struct("<Q")
+# seq, pid penulis, kind, id, nilai, flag
+ENTRY = struct.Struct("<QqBqdB")
+
+
+class Generations:
+    """Nomor generasi per nama yang dibagi antar proses worker.
+
+    Cache per proses (profil, index rekomendasi, statistik dashboard) tidak
+    tahu ada penulisan di worker lain. Worker yang menulis memanggil
+    `bump(name)` setelah commit; worker lain memanggil `changed(name)` di
+    awal request dan membuang cache lokalnya bila generasinya berubah.
+
+    Untuk perubahan yang cukup diterapkan per id (mis. ulasan baru untuk
+    satu tukang), penulis memanggil `log(kind, id)` dan worker lain membaca
+    entri barunya lewat `changes()`, jadi tidak perlu membuang seluruh cache.
+
+    Nilai disimpan di mmap MAP_SHARED: tanpa `path` file sementara yang
+    dibagi ke semua proses yang di-fork setelah objek ini dibuat (serve.py,
+    atau server pre-fork lain yang meng-import app sebelum fork); dengan
+    `path` file yang di-mmap, untuk worker yang meng-import app sendiri di
+    host yang sama. Setiap bump menulis nilai acak baru, bukan +1, sehingga
+    tidak perlu lock antar proses: penulisan yang saling menimpa tetap
+    terlihat sebagai perubahan oleh pembaca. Log perubahan berupa ring
+    buffer `log_size` entri yang ditulis di bawah lockf.
+    """
+
+    def __init__(self, names, path=None, kinds=(), log_size=1024):
+        self.names = tuple(names)
+        self.kinds = tuple(kinds)
+        self.path = path
+        self.log_size = log_size
+        self._slot = {name: i * SLOT.size for i, name in enumerate(self.names)}
+        self._head = SLOT.size * len(self.names)
+        self._ring = self._head + SLOT.size
+        size = self._ring + ENTRY.size * log_size
+        if path is None:
+            # file sementara (bukan mmap anonim) supaya ada fd untuk lockf
+            self._file = tempfile.TemporaryFile()
+            fd = self._file.fileno()
+        else:
+            self._file = None
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._mm = mmap.mmap(fd, size)
+        self._fd = fd
+        self._seen = {name: self.get(name) for name in self.names}
+        self._log_seen = self._get_head()
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        return SLOT.unpack_from(self._mm, self._slot[name])[0]
+
+    def bump(self, *names):
+        """Tandai `names` berubah untuk semua worker; panggil setelah commit."""
+        for name in names:
+            token = SLOT.unpack(os.urandom(SLOT.size))[0]
+            with self._lock:
+                before = self.get(name)
+                SLOT.pack_into(self._mm, self._slot[name], token)
+                # cache proses ini sudah diperbarui oleh pemanggil; bila ada
+                # perubahan worker lain yang belum dilihat, biarkan changed()
+                # tetap melaporkannya
+                if before == self._seen[name]:
+                    self._seen[name] = token
+
+    def changed(self, name):
+        """True sekali setiap kali worker lain mengubah `name` sejak dicek terakhir."""
+        current = self.get(name)
+        if current == self._seen[name]:
+            return False
+        with self._lock:
+            if current == self._seen[name]:
+                return False
+            self._seen[name] = current
+        return True
+
+    def _get_head(self):
+        return SLOT.unpack_from(self._mm, self._head)[0]
+
+    def log(self, kind, id, value=0.0, flag=False):
+        """Catat perubahan `kind` untuk satu `id`; panggil setelah commit."""
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                seq = self._get_head()
+                ENTRY.pack_into(self._mm, self._ring + (seq % self.log_size) * ENTRY.size,
+                                seq, os.getpid(), self.kinds.index(kind), id,
+                                float(value), bool(flag))
+                SLOT.pack_into(self._mm, self._head, seq + 1)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def changes(self):
+        """Entri (kind, id, value, flag) dari worker lain sejak dicek terakhir.
+
+        Return None bila sebagian entri sudah tertimpa (ring penuh); pemanggil
+        harus membuang seluruh cache yang bergantung pada log ini.
+        """
+        head = self._get_head()
+        if head == self._log_seen:
+            return []
+        with self._lock:
+            start = self._log_seen
+            fcntl.lockf(self._fd, fcntl.LOCK_SH)
+            try:
+                head = self._get_head()
+                if head - start > self.log_size:
+                    entries = None
+                else:
+                    entries = [
+                        ENTRY.unpack_from(self._mm, self._ring + (seq % self.log_size) * ENTRY.size)
+                        for seq in range(start, head)
+                    ]
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+            self._log_seen = head
+        if entries is None:
+            return None
+        pid = os.getpid()
+        return [(self.kinds[kind], id, value, bool(flag))
+                for _, writer, kind, id, value, flag in entries if writer != pid]
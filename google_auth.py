@@ -0,0 +1,141 @@
+import logging
+import re
+import threading
+import time
+
+
+log = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+
+class HttpCertSource:
+    """Ambil sertifikat publik Google lewat satu session HTTP yang dipakai ulang."""
+
+    def __init__(self, url=GOOGLE_CERTS_URL, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        self.session = None
+
+    def fetch(self):
+        """Return (certs {kid: pem}, max_age detik dari Cache-Control)."""
+        if self.session is None:
+            import requests
+            self.session = requests.Session()
+
+        resp = self.session.get(self.url, timeout=self.timeout)
+        resp.raise_for_status()
+
+        match = re.search(r"max-age=(\d+)", resp.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else 3600
+        return resp.json(), max_age
+
+
+class StaticCertSource:
+    """Sumber sertifikat tetap, untuk test/benchmark offline dengan key lokal."""
+
+    def __init__(self, certs, max_age=3600):
+        self.certs = certs
+        self.max_age = max_age
+
+    def fetch(self):
+        return dict(self.certs), self.max_age
+
+
+class GoogleTokenVerifier:
+    """Verifikasi id_token Google secara lokal dengan sertifikat yang di-cache.
+
+    Sertifikat disimpan sampai max-age dari Google habis dan diperbarui di
+    thread background sebelum kedaluwarsa, jadi verifikasi di jalur request
+    hanya berupa cek tanda tangan lokal. Jika token memakai `kid` yang
+    belum dikenal (rotasi key), sertifikat di-fetch ulang sekali.
+    """
+
+    def __init__(self, client_id, source=None, refresh_margin=300, min_refetch_interval=30):
+        self.client_id = client_id
+        self.source = source
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self._certs = {}
+        self._expires = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._timer = None
+        self.fetches = 0
+
+    def _refresh(self, stale=None):
+        """Fetch ulang sertifikat; `stale` adalah dict yang dilihat pemanggil.
+
+        Dicek ulang di dalam lock: bila thread lain sudah menggantinya dan
+        hasilnya belum kedaluwarsa, dipakai tanpa request ke Google.
+        """
+        with self._lock:
+            if (stale is not None and self._certs is not stale
+                    and self._certs and time.monotonic() < self._expires):
+                return self._certs
+            if self.source is None:
+                self.source = HttpCertSource()
+            certs, max_age = self.source.fetch()
+            now = time.monotonic()
+            self._certs = certs
+            self._expires = now + max_age
+            self._fetched_at = now
+            self.fetches += 1
+            self._schedule(max_age)
+        return certs
+
+    def _schedule(self, max_age):
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = max(max_age - self.refresh_margin, self.min_refetch_interval)
+        self._timer = threading.Timer(delay, self._refresh_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_background(self):
+        try:
+            self._refresh(self._certs)
+        except Exception:
+            log.exception("gagal memperbarui sertifikat Google")
+            # coba lagi nanti; sertifikat lama tetap dipakai sampai kedaluwarsa
+            with self._lock:
+                self._schedule(self.min_refetch_interval + self.refresh_margin)
+
+    def certs(self):
+        certs = self._certs
+        if not certs or time.monotonic() >= self._expires:
+            return self._refresh(certs)
+        return certs
+
+    def verify(self, token):
+        """Return payload token; ValueError bila token tidak valid."""
+        from google.auth import jwt
+        from google.auth import exceptions
+
+        certs = self.certs()
+        try:
+            header = jwt.decode_header(token)
+        except Exception as e:
+            raise ValueError(f"Token tidak valid: {e}")
+
+        kid = header.get("kid")
+        if kid and kid not in certs and time.monotonic() - self._fetched_at > self.min_refetch_interval:
+            certs = self._refresh(certs)
+
+        try:
+            payload = jwt.decode(token, certs=certs, audience=self.client_id,
+                                 clock_skew_in_seconds=10)
+        except exceptions.GoogleAuthError as e:
+            raise ValueError(str(e))
+
+        if payload.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Issuer tidak valid: {payload.get('iss')}")
+        return payload
+
+    def stats(self):
+        return {
+            "fetches": self.fetches,
+            "keys": len(self._certs),
+            "expires_in": round(max(self._expires - time.monotonic(), 0), 1),
+        }
@@ -0,0 +1,94 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check(pw_hash, password):
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), pw_hash.encode("utf-8"))
+    except ValueError:
+        # hash bukan format bcrypt
+        return False
+
+
+def hash_rounds(pw_hash):
+    try:
+        return int(pw_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Hash/verifikasi bcrypt di process pool terpisah.
+
+    bcrypt murni CPU dan bisa makan puluhan sampai ratusan ms; dengan
+    process pool thread request hanya menunggu hasil. `max_pending`
+    membatasi jumlah operasi yang antre; lebih dari itu `HasherBusy`.
+    `workers=0` menjalankan bcrypt langsung di thread pemanggil.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_pending=64, timeout=10.0):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: aman walaupun proses induk sudah punya banyak thread.
+                    # anak meng-import ulang skrip utama sebagai __mp_main__,
+                    # jadi inisialisasi berat aplikasi ada di app.startup(),
+                    # bukan di level modul
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy("Terlalu banyak proses login bersamaan")
+        try:
+            future = self._get_executor().submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeout:
+                # yang belum mulai tidak perlu dijalankan lagi; yang sedang
+                # berjalan tetap selesai di process pool
+                future.cancel()
+                raise HasherBusy("Proses hash password terlalu lama") from None
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def check(self, pw_hash, password):
+        if not pw_hash:
+            return False
+        return self._run(_check, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        return hash_rounds(pw_hash) != self.rounds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,72 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, request
+
+from cache import LRUCache
+
+
+class PageCache:
+    """Cache HTML halaman yang isinya sama untuk semua pengunjung.
+
+    Halaman dirender sekali lalu disimpan bersama ETag (hash isi) dan
+    Last-Modified. Request berikutnya dilayani dari memori; bila browser
+    mengirim If-None-Match / If-Modified-Since yang cocok, balasannya 304
+    tanpa body. Hanya untuk view yang tidak bergantung pada session.
+    """
+
+    def __init__(self, max_age=300, maxsize=64, enabled=True):
+        self.max_age = max_age
+        self.enabled = enabled
+        self._pages = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.not_modified = 0
+
+    def _render(self, key, view, args, kwargs):
+        body = view(*args, **kwargs)
+        if isinstance(body, Response):
+            # redirect / error: jangan di-cache
+            return None, body
+        body = body.encode("utf-8") if isinstance(body, str) else body
+        entry = {
+            "body": body,
+            "etag": hashlib.sha256(body).hexdigest()[:32],
+            "modified": datetime.now(timezone.utc).replace(microsecond=0),
+        }
+        self._pages.set(key, entry)
+        return entry, None
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return view(*args, **kwargs)
+
+            key = request.path
+            entry = self._pages.get(key)
+            if entry is None:
+                entry, response = self._render(key, view, args, kwargs)
+                if entry is None:
+                    return response
+
+            response = Response(entry["body"], mimetype="text/html")
+            response.set_etag(entry["etag"])
+            response.last_modified = entry["modified"]
+            response.cache_control.public = True
+            response.cache_control.max_age = self.max_age
+            response = response.make_conditional(request)
+            if response.status_code == 304:
+                with self._lock:
+                    self.not_modified += 1
+            return response
+        return wrapper
+
+    def clear(self):
+        self._pages.clear()
+
+    def stats(self):
+        s = self._pages.stats()
+        s["not_modified"] = self.not_modified
+        return s
@@ -0,0 +1,162 @@
+import hashlib
+import io
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+from PIL import Image
+
+
+IMAGE_SIZE = (128, 128)
+
+LABELS = ["Retak Dinding", "Plafon Rusak", "Keramik Rusak", "Cat Mengelupas", "Kayu Kusen Lapuk", "Dinding Berjamur"]
+
+
+def image_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_image(data, size=IMAGE_SIZE):
+    """Decode gambar langsung dari bytes upload menjadi array (H, W, 3) 0..1.
+
+    Untuk JPEG dipakai draft mode sehingga decoder langsung mengecilkan
+    gambar (1/2, 1/4, 1/8) tanpa decode resolusi penuh.
+    """
+    img = Image.open(io.BytesIO(data))
+    img.draft("RGB", size)
+    img = img.convert("RGB").resize(size)
+    return np.asarray(img, dtype=np.float32) / 255.0
+
+
+class PredictorBusy(Exception):
+    pass
+
+
+class BatchPredictor:
+    """Menggabungkan request deteksi yang datang bersamaan menjadi satu batch predict.
+
+    Worker thread mengambil item dari antrian sampai `max_batch_size` terpenuhi
+    atau `max_wait_ms` habis, lalu memanggil `predict_fn` sekali untuk semuanya.
+    Jika batching dimatikan atau antrian penuh, prediksi dijalankan langsung
+    (fallback sinkron). Request yang menunggu lebih dari `timeout` mendapat
+    `PredictorBusy` dan item-nya dibuang dari batch berikutnya.
+    """
+
+    def __init__(self, predict_fn, labels, max_batch_size=16, max_wait_ms=10,
+                 max_queue=256, enabled=True):
+        self.predict_fn = predict_fn
+        self.labels = labels
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._predict_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "sync_fallback": 0,
+            "timeouts": 0,
+            "batch_size_max": 0,
+            "queue_wait_total_ms": 0.0,
+            "queue_wait_max_ms": 0.0,
+        }
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="deteksi-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _to_result(self, probs):
+        label_index = int(np.argmax(probs))
+        confidence = float(np.max(probs) * 100)
+        return self.labels[label_index], confidence
+
+    def predict_sync(self, img):
+        """img: array (128, 128, 3) yang sudah dinormalisasi."""
+        with self._predict_lock:
+            pred = self.predict_fn(np.expand_dims(img, axis=0))
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["sync_fallback"] += 1
+        return self._to_result(pred[0])
+
+    def predict(self, img, timeout=30):
+        if not self.enabled:
+            return self.predict_sync(img)
+
+        self._ensure_worker()
+        fut = Future()
+        try:
+            self._queue.put_nowait((img, fut, time.perf_counter()))
+        except queue.Full:
+            return self.predict_sync(img)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            # belum diambil worker: cancel supaya tidak ikut diprediksi
+            fut.cancel()
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            raise PredictorBusy("Deteksi sedang sibuk, coba lagi") from None
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # item yang sudah timeout (future di-cancel) tidak diprediksi
+            batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            now = time.perf_counter()
+            waits = [(now - enqueued) * 1000 for _, _, enqueued in batch]
+
+            try:
+                imgs = np.stack([img for img, _, _ in batch])
+                with self._predict_lock:
+                    preds = self.predict_fn(imgs)
+            except Exception as e:
+                for _, fut, _ in batch:
+                    fut.set_exception(e)
+                continue
+
+            for (_, fut, _), probs in zip(batch, preds):
+                fut.set_result(self._to_result(probs))
+
+            with self._stats_lock:
+                s = self._stats
+                s["requests"] += len(batch)
+                s["batches"] += 1
+                s["batch_size_max"] = max(s["batch_size_max"], len(batch))
+                s["queue_wait_total_ms"] += sum(waits)
+                s["queue_wait_max_ms"] = max(s["queue_wait_max_ms"], max(waits))
+
+    def stats(self):
+        with self._stats_lock:
+            s = dict(self._stats)
+        batched = s["requests"] - s["sync_fallback"]
+        s["batch_size_avg"] = round(batched / s["batches"], 2) if s["batches"] else 0.0
+        s["queue_wait_avg_ms"] = round(s["queue_wait_total_ms"] / batched, 3) if batched else 0.0
+        s["queue_depth"] = self._queue.qsize()
+        return s
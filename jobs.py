@@ -0,0 +1,175 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+
+log = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobStore:
+    """Status dan hasil job di tabel deteksi_jobs (lihat migrations.py).
+
+    Semua worker/proses membaca tabel yang sama, jadi job yang di-submit di
+    satu worker bisa di-poll lewat worker lain. Baris berlaku sampai
+    `expires_at` (dihitung dengan jam database); yang kedaluwarsa dianggap
+    tidak ada dan dihapus bertahap paling sering sekali per `purge_interval`.
+    """
+
+    def __init__(self, ttl=600, purge_interval=60, purge_batch=1000):
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self.purge_batch = purge_batch
+        self._next_purge = 0.0
+
+    def _execute(self, sql, params):
+        with database.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rowcount = cur.rowcount
+            conn.commit()
+            cur.close()
+        return rowcount
+
+    def create(self, job_id, owner):
+        self._execute("""
+            INSERT INTO deteksi_jobs (id_job, owner, status, expires_at)
+            VALUES (%s, %s, 'pending', NOW() + INTERVAL %s SECOND)
+        """, (job_id, owner, self.ttl))
+
+        now = time.monotonic()
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.purge()
+
+    def update(self, job_id, status, result=None, error=None):
+        # expires_at di-set ulang supaya TTL dihitung dari waktu selesai
+        self._execute("""
+            UPDATE deteksi_jobs
+            SET status = %s, result = %s, error = %s, expires_at = NOW() + INTERVAL %s SECOND
+            WHERE id_job = %s
+        """, (status, json.dumps(result) if result is not None else None, error,
+              self.ttl, job_id))
+
+    def get(self, job_id, owner=None):
+        with database.pool.connection() as conn:
+            cur = conn.cursor(dictionary=True)
+            cur.execute("""
+                SELECT id_job, owner, status, result, error FROM deteksi_jobs
+                WHERE id_job = %s AND expires_at > NOW()
+            """, (job_id,))
+            row = cur.fetchone()
+            cur.close()
+
+        if row is None or (owner is not None and row["owner"] != owner):
+            return None
+        return {
+            "id": row["id_job"],
+            "owner": row["owner"],
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+        }
+
+    def purge(self):
+        try:
+            return self._execute(
+                "DELETE FROM deteksi_jobs WHERE expires_at <= NOW() LIMIT %s",
+                (self.purge_batch,)
+            )
+        except Exception:
+            log.exception("gagal menghapus job deteksi yang kedaluwarsa")
+            return 0
+
+
+class JobManager:
+    """Menjalankan pekerjaan (deteksi) di worker pool terbatas.
+
+    Thread pool hanya untuk eksekusi; status dan hasil disimpan di `store`
+    (tabel bersama) sehingga bisa dibaca dari worker mana pun sampai TTL
+    habis. Jumlah job yang menunggu di proses ini dibatasi `max_pending`
+    supaya antrian tidak tumbuh tanpa batas saat beban tinggi.
+    """
+
+    def __init__(self, store, workers=2, max_pending=64):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def _get_executor(self):
+        # dibuat saat pertama dipakai (aman setelah fork)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="deteksi-job"
+                    )
+        return self._executor
+
+    def submit(self, fn, *args, owner=None):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise QueueFull("Antrian deteksi penuh")
+            self._pending += 1
+
+        job_id = uuid.uuid4().hex
+        try:
+            self.store.create(job_id, owner)
+            self._get_executor().submit(self._run, job_id, fn, args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        with self._lock:
+            self._stats["submitted"] += 1
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+
+        stat = "failed"
+        try:
+            self.store.update(job_id, "running")
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self.store.update(job_id, "error", error=str(e))
+            else:
+                self.store.update(job_id, "done", result=result)
+                stat = "completed"
+        except Exception:
+            log.exception("gagal menyimpan status job deteksi %s", job_id)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._stats[stat] += 1
+
+    def get(self, job_id, owner=None):
+        return self.store.get(job_id, owner)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["queue_depth"] = self._pending
+            s["running"] = self._running
+        s["workers"] = self.workers
+        s["max_pending"] = self.max_pending
+        s["ttl"] = self.store.ttl
+        return s
@@ -0,0 +1,216 @@
+import bisect
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from flask import Response, g, has_request_context, request
+from flask.signals import before_render_template, template_rendered
+
+
+# detik; cukup rapat di bawah 10 ms untuk query dan inferensi kecil
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histogram ala Prometheus dengan label; satu lock, tanpa alokasi per sample."""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [count per bucket..., +Inf, sum]
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def collect(self):
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.collect().items()):
+            base = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += n
+                le = ",".join(base + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            suffix = "{" + ",".join(base) + "}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    """Nilai yang dibaca saat scrape lewat callback (ukuran pool, antrian, dll)."""
+
+    def __init__(self, name, help, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+    def render(self):
+        try:
+            value = float(self.fn())
+        except Exception:
+            return ""
+        return f"# HELP {self.name} {self.help}\n# TYPE {self.name} gauge\n{self.name} {value}"
+
+
+def memory_usage(pid="self"):
+    """Memori proses (bytes) dari /proc: rss, pss, shared dan private.
+
+    `shared` adalah halaman yang juga dipakai proses lain, misalnya model
+    yang di-load master sebelum fork dan belum pernah ditulis worker (pss
+    membagi halaman itu rata ke semua proses). None bila /proc tidak ada.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except OSError:
+        pass
+    if fields:
+        return {
+            "rss": fields.get("Rss", 0),
+            "pss": fields.get("Pss", 0),
+            "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+            "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        }
+
+    # kernel lama tanpa smaps_rollup: statm (shared di sini hanya file-backed)
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            _, resident, shared = (int(v) * os.sysconf("SC_PAGE_SIZE") for v in f.read().split()[:3])
+    except (OSError, ValueError):
+        return None
+    return {"rss": resident, "pss": None, "shared": shared, "private": resident - shared}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_IN_LIST = re.compile(r"\(\s*(\?|%s)(\s*,\s*(\?|%s))+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Bentuk SQL tanpa literal, dipakai sebagai label; di-cache per string SQL."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()[:200]
+
+
+class Metrics:
+    """Kumpulan histogram aplikasi: request, query SQL, model, render template.
+
+    Setiap sample cukup bisect + satu lock (beberapa mikrodetik), jadi
+    aman dibiarkan aktif di produksi. Bila `server_timing` aktif, waktu
+    db/model/render per request juga dikirim di header `Server-Timing`.
+    """
+
+    def __init__(self):
+        self.requests = Histogram(
+            "http_request_duration_seconds", "Latency request per route",
+            ("method", "endpoint", "status"))
+        self.queries = Histogram(
+            "db_query_duration_seconds", "Latency query per bentuk SQL", ("query",))
+        self.models = Histogram(
+            "model_duration_seconds", "Latency pemanggilan model", ("model",))
+        self.templates = Histogram(
+            "template_render_duration_seconds", "Latency render template", ("template",))
+        self._metrics = [self.requests, self.queries, self.models, self.templates]
+
+    def gauge(self, name, help, fn):
+        self._metrics.append(Gauge(name, help, fn))
+
+    def _timing(self, name, seconds):
+        # ikut dijumlahkan ke Server-Timing bila dipanggil di thread request
+        if has_request_context():
+            timings = g.get("_timings")
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + seconds
+
+    def observe_query(self, sql, params, seconds):
+        self.queries.observe(seconds, normalize_sql(sql))
+        self._timing("db", seconds)
+
+    def observe_model(self, name, seconds):
+        self.models.observe(seconds, name)
+        self._timing(name, seconds)
+
+    @contextmanager
+    def time_model(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_model(name, time.perf_counter() - start)
+
+    def render(self):
+        return "\n".join(filter(None, (m.render() for m in self._metrics))) + "\n"
+
+
+def init_app(app, metrics):
+    app.config.setdefault("METRICS_SERVER_TIMING", False)
+
+    @app.before_request
+    def start_timer():
+        g._request_start = time.perf_counter()
+        g._timings = {}
+
+    @app.after_request
+    def record_request(response):
+        start = g.get("_request_start")
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        metrics.requests.observe(elapsed, request.method, request.endpoint or "none",
+                                 str(response.status_code))
+
+        if app.config["METRICS_SERVER_TIMING"]:
+            parts = [f"{name};dur={s * 1000:.2f}" for name, s in g._timings.items()]
+            parts.append(f"total;dur={elapsed * 1000:.2f}")
+            response.headers["Server-Timing"] = ", ".join(parts)
+        return response
+
+    def render_started(sender, template, context, **extra):
+        if has_request_context():
+            g._render_start = time.perf_counter()
+
+    def render_finished(sender, template, context, **extra):
+        start = g.pop("_render_start", None) if has_request_context() else None
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            metrics.templates.observe(elapsed, template.name or "string")
+            metrics._timing("render", elapsed)
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
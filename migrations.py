@@ -0,0 +1,375 @@
+import logging
+import threading
+from collections import namedtuple
+
+import click
+
+import database
+import sentiment
+import stats
+
+
+log = logging.getLogger(__name__)
+
+Migration = namedtuple("Migration", "version name up")
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def register(fn):
+        MIGRATIONS.append(Migration(version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+
+def column_exists(cur, table, column):
+    cur.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cur.fetchone()[0] > 0
+
+
+def index_columns(cur, table, name):
+    cur.execute("""
+        SELECT COLUMN_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        ORDER BY SEQ_IN_INDEX
+    """, (table, name))
+    return [r[0] for r in cur.fetchall()]
+
+
+def add_column(cur, table, column, definition):
+    if not column_exists(cur, table, column):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def add_index(cur, table, name, columns):
+    # MySQL tidak punya CREATE INDEX IF NOT EXISTS
+    if not index_columns(cur, table, name):
+        cur.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+
+# migrasi: jangan ubah yang sudah dirilis, tambahkan versi baru
+
+@migration(1, "tabel awal")
+def create_tables(cur):
+    # IF NOT EXISTS: database lama yang dibuat manual tetap bisa dimigrasi
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id_users INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(100) NOT NULL,
+            email VARCHAR(255) NOT NULL,
+            password VARCHAR(255) NULL,
+            role VARCHAR(20) NOT NULL DEFAULT 'customer',
+            auth_provider VARCHAR(20) NOT NULL DEFAULT 'local',
+            google_id VARCHAR(64) NULL
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tukang (
+            id_tukang INT AUTO_INCREMENT PRIMARY KEY,
+            nama VARCHAR(100) NOT NULL,
+            keahlian TEXT,
+            pengalaman TEXT,
+            foto VARCHAR(255),
+            rating FLOAT NOT NULL DEFAULT 0,
+            jumlah_ulasan INT NOT NULL DEFAULT 0
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS review (
+            id_review INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            tukang_id INT NOT NULL,
+            review_text TEXT,
+            sentiment VARCHAR(10),
+            rating TINYINT NOT NULL,
+            tanggal DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS orders (
+            id_order INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            tukang_id INT NOT NULL
+        )
+    """)
+
+
+@migration(2, "counter rating_sum tukang")
+def add_rating_sum(cur):
+    add_column(cur, "tukang", "rating_sum", "INT NOT NULL DEFAULT 0")
+    cur.execute("""
+        UPDATE tukang t
+        LEFT JOIN (
+            SELECT tukang_id, SUM(rating) AS total, COUNT(*) AS n
+            FROM review GROUP BY tukang_id
+        ) a ON a.tukang_id = t.id_tukang
+        SET
+            t.rating_sum = IFNULL(a.total, 0),
+            t.jumlah_ulasan = IFNULL(a.n, 0),
+            t.rating = IFNULL(a.total / a.n, 0)
+    """)
+
+
+@migration(3, "index query utama")
+def add_hot_indexes(cur):
+    # login / register / cek email
+    add_index(cur, "users", "idx_users_email", ["email"])
+    # login google
+    add_index(cur, "users", "idx_users_google_id", ["google_id"])
+    # kelola customer (keyset id_users) dan jumlah customer dashboard
+    add_index(cur, "users", "idx_users_role_id", ["role", "id_users"])
+    # ulasan di lihat_tukang, terbaru dulu
+    add_index(cur, "review", "idx_review_tukang_tanggal", ["tukang_id", "tanggal"])
+    # kelola review (keyset tanggal, id_review)
+    add_index(cur, "review", "idx_review_tanggal_id", ["tanggal", "id_review"])
+    # histogram rating dashboard
+    add_index(cur, "review", "idx_review_rating", ["rating"])
+    # jumlah ulasan negatif per tukang (covering untuk GROUP BY)
+    add_index(cur, "review", "idx_review_sentiment_tukang", ["sentiment", "tukang_id"])
+
+
+@migration(4, "ringkasan ulasan tukang (negatif, per bintang)")
+def add_review_summary(cur):
+    add_column(cur, "tukang", "jumlah_negatif", "INT NOT NULL DEFAULT 0")
+    for i in range(1, 6):
+        add_column(cur, "tukang", f"bintang_{i}", "INT NOT NULL DEFAULT 0")
+    # semua counter diisi ulang dari tabel review; SQL dibekukan di sini,
+    # bukan ratings.REBUILD_SQL, supaya migrasi tidak ikut berubah
+    cur.execute("""
+        UPDATE tukang t
+        LEFT JOIN (
+            SELECT
+                tukang_id,
+                SUM(rating) AS total,
+                COUNT(*) AS n,
+                SUM(sentiment = 'negatif') AS negatif,
+                SUM(rating = 1) AS b1,
+                SUM(rating = 2) AS b2,
+                SUM(rating = 3) AS b3,
+                SUM(rating = 4) AS b4,
+                SUM(rating = 5) AS b5
+            FROM review GROUP BY tukang_id
+        ) a ON a.tukang_id = t.id_tukang
+        SET
+            t.rating_sum = IFNULL(a.total, 0),
+            t.jumlah_ulasan = IFNULL(a.n, 0),
+            t.jumlah_negatif = IFNULL(a.negatif, 0),
+            t.bintang_1 = IFNULL(a.b1, 0),
+            t.bintang_2 = IFNULL(a.b2, 0),
+            t.bintang_3 = IFNULL(a.b3, 0),
+            t.bintang_4 = IFNULL(a.b4, 0),
+            t.bintang_5 = IFNULL(a.b5, 0),
+            t.rating = IFNULL(a.total / a.n, 0)
+    """)
+
+
+@migration(5, "tabel job deteksi async")
+def add_deteksi_jobs(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS deteksi_jobs (
+            id_job CHAR(32) PRIMARY KEY,
+            owner VARCHAR(64) NULL,
+            status VARCHAR(10) NOT NULL,
+            result TEXT NULL,
+            error TEXT NULL,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            expires_at DATETIME NOT NULL
+        )
+    """)
+    # hapus job kedaluwarsa (jobs.JobStore.purge)
+    add_index(cur, "deteksi_jobs", "idx_deteksi_jobs_expires", ["expires_at"])
+
+
+def ensure_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied(conn):
+    cur = conn.cursor()
+    ensure_table(cur)
+    cur.execute("SELECT version FROM schema_migrations")
+    versions = {r[0] for r in cur.fetchall()}
+    cur.close()
+    return versions
+
+
+def pending(conn):
+    done = applied(conn)
+    return [m for m in MIGRATIONS if m.version not in done]
+
+
+def upgrade(conn, target=None):
+    """Jalankan migrasi yang belum diterapkan secara berurutan."""
+    ran = []
+    for m in pending(conn):
+        if target is not None and m.version > target:
+            break
+        log.info("migrasi %d: %s", m.version, m.name)
+        cur = conn.cursor()
+        m.up(cur)
+        cur.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (m.version, m.name)
+        )
+        conn.commit()
+        cur.close()
+        ran.append(m)
+    return ran
+
+
+# query di jalur panas app.py dengan contoh parameter; `verify` memastikan
+# setiap query memakai index (bukan full scan) lewat EXPLAIN
+HotQuery = namedtuple("HotQuery", "name table index sql params alias", defaults=(None,))
+HOT_QUERIES = [
+    HotQuery("api_login", "users", "idx_users_email",
+             "SELECT * FROM users WHERE email=%s AND role='customer' AND auth_provider='local'",
+             ("a@contoh.id",)),
+    HotQuery("login", "users", "idx_users_email",
+             "SELECT * FROM users WHERE email=%s", ("a@contoh.id",)),
+    HotQuery("api_login_google", "users", "idx_users_google_id",
+             "SELECT * FROM users WHERE google_id=%s AND role='customer' AND auth_provider='google'",
+             ("123",)),
+    HotQuery("kelola_customers", "users", "idx_users_role_id",
+             "SELECT * FROM users WHERE role = 'customer' AND id_users > %s ORDER BY id_users LIMIT %s",
+             (0, 51)),
+    HotQuery("lihat_tukang", "review", "idx_review_tukang_tanggal",
+             "SELECT r.id_review FROM review r WHERE r.tukang_id = %s "
+             "AND (r.tanggal < %s OR (r.tanggal = %s AND r.id_review < %s)) "
+             "ORDER BY r.tanggal DESC, r.id_review DESC LIMIT %s",
+             (1, "2030-01-01 00:00:00", "2030-01-01 00:00:00", 1, 11), "r"),
+    HotQuery("review", "review", "idx_review_tanggal_id",
+             "SELECT r.id_review FROM review r "
+             "WHERE r.tanggal < %s OR (r.tanggal = %s AND r.id_review < %s) "
+             "ORDER BY r.tanggal DESC, r.id_review DESC LIMIT %s",
+             ("2030-01-01 00:00:00", "2030-01-01 00:00:00", 1, 51), "r"),
+    # statement dashboard yang sebenarnya (stats.py); TOTALS_SQL memuat dua tabel
+    HotQuery("dashboard_rating", "review", "idx_review_rating", stats.RATING_SQL, ()),
+    HotQuery("dashboard_tukang", "tukang", "PRIMARY", stats.TOTALS_SQL, ()),
+    HotQuery("dashboard_customer", "users", "idx_users_role_id", stats.TOTALS_SQL, ()),
+    HotQuery("sentiment_train", "review", "PRIMARY", sentiment.TRAIN_SQL, (0, 512)),
+    HotQuery("api_deteksi_status", "deteksi_jobs", "PRIMARY",
+             "SELECT id_job, owner, status, result, error FROM deteksi_jobs "
+             "WHERE id_job = %s AND expires_at > NOW()", ("0" * 32,)),
+    HotQuery("tulis_ulasan", "orders", "PRIMARY",
+             "SELECT tukang_id FROM orders WHERE id_order=%s", (1,)),
+]
+
+
+def verify(conn):
+    """EXPLAIN setiap query panas; return list hasil per query.
+
+    status `ok`: index dipakai; `warn`: index ada tapi optimizer memilih
+    full scan (biasanya tabel masih kecil); `fail`: full scan tanpa index.
+    """
+    results = []
+    cur = conn.cursor(dictionary=True)
+    meta = conn.cursor()
+    for q in HOT_QUERIES:
+        cur.execute("EXPLAIN " + q.sql, q.params)
+        plan = [r for r in cur.fetchall() if r.get("table") in (q.table, q.alias)]
+        row = plan[0] if plan else {}
+
+        if row.get("type") != "ALL" and row.get("key"):
+            status = "ok"
+        elif index_columns(meta, q.table, q.index):
+            status = "warn"
+        else:
+            status = "fail"
+        results.append({
+            "query": q.name,
+            "status": status,
+            "type": row.get("type"),
+            "key": row.get("key"),
+            "expected": q.index,
+            "rows": row.get("rows"),
+        })
+    cur.close()
+    meta.close()
+    return results
+
+
+def check(app):
+    """Cek saat startup: ada migrasi yang belum diterapkan?
+
+    DB_SCHEMA_CHECK: warn (default, di background) | strict (gagal start) | off
+    """
+    mode = app.config.get("DB_SCHEMA_CHECK", "warn")
+    if mode == "off":
+        return None
+
+    def run():
+        with database.pool.connection() as conn:
+            todo = pending(conn)
+        if todo:
+            names = ", ".join(f"{m.version} ({m.name})" for m in todo)
+            if mode == "strict":
+                raise RuntimeError(f"Migrasi belum diterapkan: {names}; jalankan `flask db upgrade`")
+            log.warning("migrasi belum diterapkan: %s; jalankan `flask db upgrade`", names)
+        return todo
+
+    if mode == "strict":
+        return run()
+
+    def run_background():
+        try:
+            run()
+        except Exception as e:
+            log.warning("tidak bisa memeriksa migrasi database: %s", e)
+
+    thread = threading.Thread(target=run_background, name="schema-check", daemon=True)
+    thread.start()
+    return thread
+
+
+@click.group("db")
+def db_command():
+    """Migrasi skema database."""
+
+
+@db_command.command("upgrade")
+@click.option("--to", "target", type=int, help="Berhenti di versi ini.")
+def upgrade_command(target):
+    """Terapkan migrasi yang belum dijalankan."""
+    with database.pool.connection() as conn:
+        ran = upgrade(conn, target)
+    for m in ran:
+        click.echo(f"diterapkan {m.version}: {m.name}")
+    click.echo(f"{len(ran)} migrasi diterapkan")
+
+
+@db_command.command("status")
+def status_command():
+    """Tampilkan versi skema dan migrasi yang belum diterapkan."""
+    with database.pool.connection() as conn:
+        done = applied(conn)
+    for m in MIGRATIONS:
+        mark = "x" if m.version in done else " "
+        click.echo(f"[{mark}] {m.version}: {m.name}")
+
+
+@db_command.command("verify")
+def verify_command():
+    """EXPLAIN query utama dan pastikan semuanya memakai index."""
+    with database.pool.connection() as conn:
+        results = verify(conn)
+    for r in results:
+        click.echo(
+            f"{r['status']:<5} {r['query']:<20} type={r['type']} key={r['key']} "
+            f"(harusnya {r['expected']}) rows={r['rows']}"
+        )
+    if any(r["status"] == "fail" for r in results):
+        raise SystemExit(1)
+
+
+def init_app(app):
+    app.cli.add_command(db_command)
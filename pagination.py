@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import date, datetime
+
+from flask import current_app
+
+import database
+
+
+def _plain(v):
+    if isinstance(v, datetime):
+        return v.isoformat(" ")
+    if isinstance(v, date):
+        return v.isoformat()
+    return v
+
+
+def encode_cursor(*values):
+    """Posisi terakhir halaman (nilai kolom key) -> token aman untuk URL."""
+    raw = json.dumps([_plain(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def parse_limit(args, default=50, maximum=200):
+    try:
+        limit = int(args.get("limit", default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def keyset_page(cursor, sql, params, limit, key):
+    """Jalankan query keyset (sudah ORDER BY key) dan ambil satu halaman.
+
+    `sql` harus diakhiri `LIMIT %s`; diambil `limit + 1` baris untuk tahu
+    apakah masih ada halaman berikutnya. `key(row)` mengembalikan tuple
+    nilai kolom yang dipakai untuk token halaman berikutnya.
+    """
+    cursor.execute(sql, tuple(params) + (limit + 1,))
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*key(rows[-1]))
+    return rows, next_cursor
+
+
+def stream_json_array(sql, params=(), batch_size=500):
+    """Generator JSON array dari cursor tanpa buffer (server-side).
+
+    Koneksi dipinjam sendiri dari pool karena generator tetap berjalan
+    setelah fungsi view selesai.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        with database.pool.connection() as conn:
+            cur = conn.cursor(dictionary=True, buffered=False)
+            try:
+                cur.execute(sql, tuple(params))
+                yield "["
+                first = True
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield ("" if first else ",") + dumps(row)
+                        first = False
+                yield "]"
+            finally:
+                # bila client putus di tengah jalan, sisa hasil tidak dibaca;
+                # pool akan membuang sesi koneksi tersebut saat release
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+
+    return generate()
@@ -0,0 +1,179 @@
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g, has_request_context, request
+
+import database
+from cache import LRUCache
+from metrics import normalize_sql
+
+
+log = logging.getLogger("slowquery")
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryTracker:
+    """Catat semua query per request dan tandai request yang boros query.
+
+    Sebuah request ditandai bila jumlah query melewati `max_queries`
+    (bisa per endpoint lewat `budgets`), total waktu DB melewati
+    `max_db_ms`, atau satu bentuk SQL yang sama diulang `repeat_threshold`
+    kali atau lebih (pola N+1). Query lebih lambat dari `slow_ms` dan
+    query dari request yang ditandai ditulis ke log `slowquery` beserta
+    hasil EXPLAIN, dijalankan di thread terpisah pada koneksi pool lain.
+
+    Dengan `strict=True` (test/benchmark) pelanggaran budget dilempar
+    sebagai `QueryBudgetExceeded` sehingga regresi jumlah query gagal.
+    """
+
+    def __init__(self, pool=None, max_queries=30, max_db_ms=200, repeat_threshold=5,
+                 slow_ms=100, budgets=None, explain=True, explain_interval=600, strict=False):
+        self.pool = pool
+        self.max_queries = max_queries
+        self.max_db_ms = max_db_ms
+        self.repeat_threshold = repeat_threshold
+        self.slow_ms = slow_ms
+        self.budgets = dict(budgets or {})
+        self.explain = explain
+        self.strict = strict
+        # satu EXPLAIN per bentuk SQL per interval
+        self._explained = LRUCache(maxsize=1024, ttl=explain_interval)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def on_query(self, sql, params, seconds):
+        if has_request_context():
+            queries = g.get("_queries")
+            if queries is None:
+                queries = g._queries = []
+            queries.append((sql, params, seconds))
+
+    def budget(self, endpoint):
+        return self.budgets.get(endpoint, self.max_queries)
+
+    def check(self, endpoint, queries):
+        """Return daftar pelanggaran untuk query satu request."""
+        problems = []
+        budget = self.budget(endpoint)
+        if len(queries) > budget:
+            problems.append(f"{len(queries)} query (budget {budget})")
+
+        db_ms = sum(q[2] for q in queries) * 1000
+        if db_ms > self.max_db_ms:
+            problems.append(f"waktu DB {db_ms:.1f} ms (budget {self.max_db_ms} ms)")
+
+        shapes = Counter(normalize_sql(q[0]) for q in queries)
+        for shape, n in shapes.items():
+            if n >= self.repeat_threshold:
+                problems.append(f"N+1: {n}x {shape}")
+        return problems
+
+    def finish_request(self, endpoint):
+        queries = g.pop("_queries", None) or []
+        endpoint = endpoint or "none"
+        problems = self.check(endpoint, queries) if queries else []
+
+        with self._lock:
+            s = self._endpoints.setdefault(endpoint, {
+                "requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0, "flagged": 0,
+            })
+            s["requests"] += 1
+            s["queries"] += len(queries)
+            s["max_queries"] = max(s["max_queries"], len(queries))
+            s["db_ms"] += sum(q[2] for q in queries) * 1000
+            if problems:
+                s["flagged"] += 1
+                s["last_problems"] = problems
+
+        slow = [q for q in queries if q[2] * 1000 >= self.slow_ms]
+        if problems:
+            log.warning("%s %s: %s", request.method, endpoint, "; ".join(problems))
+            # contoh satu query per bentuk SQL untuk di-EXPLAIN
+            offenders = list({normalize_sql(q[0]): q for q in queries}.values())
+        else:
+            offenders = slow
+        for sql, params, seconds in slow:
+            log.warning("query lambat %.1f ms di %s: %s", seconds * 1000, endpoint, normalize_sql(sql))
+        if offenders and self.explain:
+            self._explain_later(endpoint, offenders)
+
+        if problems and self.strict:
+            raise QueryBudgetExceeded(f"{endpoint}: " + "; ".join(problems))
+
+    def _explain_later(self, endpoint, queries):
+        todo = []
+        for sql, params, _ in queries:
+            shape = normalize_sql(sql)
+            if not shape.upper().startswith(EXPLAINABLE) or self._explained.get(shape):
+                continue
+            if params is None and "%s" in sql:
+                # executemany: tidak ada satu set parameter untuk EXPLAIN
+                continue
+            self._explained.set(shape, True)
+            todo.append((sql, params))
+        if not todo:
+            return
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self._executor.submit(self._explain, endpoint, todo)
+
+    def _explain(self, endpoint, queries):
+        try:
+            pool = self.pool if self.pool is not None else database.pool
+            with pool.connection() as conn:
+                cur = conn.cursor(dictionary=True)
+                for sql, params in queries:
+                    try:
+                        cur.execute("EXPLAIN " + sql, params)
+                        plan = cur.fetchall()
+                    except Exception as e:
+                        plan = f"EXPLAIN gagal: {e}"
+                    log.warning("EXPLAIN %s: %s\n%s", endpoint, normalize_sql(sql), plan)
+                cur.close()
+        except Exception:
+            log.exception("gagal menjalankan EXPLAIN")
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for endpoint, s in self._endpoints.items():
+                s = dict(s)
+                s["avg_queries"] = round(s["queries"] / s["requests"], 2)
+                s["db_ms"] = round(s["db_ms"], 2)
+                result[endpoint] = s
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def init_app(app, tracker):
+    database.on_query(tracker.on_query)
+
+    log_path = app.config.get("SLOW_QUERY_LOG")
+    if log_path:
+        handler = logging.FileHandler(log_path)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        log.addHandler(handler)
+
+    @app.after_request
+    def check_queries(response):
+        tracker.finish_request(request.endpoint)
+        return response
+
+    @app.teardown_request
+    def drop_queries(exc=None):
+        # request gagal sebelum after_request
+        g.pop("_queries", None)
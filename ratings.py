@@ -0,0 +1,122 @@
+from collections import defaultdict
+
+import click
+
+import database
+
+
+# ringkasan ulasan per tukang disimpan sebagai counter berjalan di baris
+# tukang: rating_sum, jumlah_ulasan, jumlah_negatif dan bintang_1..5;
+# rating = rating_sum / jumlah_ulasan. `rating` ditulis paling awal dari
+# nilai lama + delta sehingga hasilnya sama di MySQL (SET dievaluasi kiri
+# ke kanan) maupun database lain yang memakai nilai sebelum update.
+STARS = range(1, 6)
+
+UPDATE_COUNTER_SQL = """
+    UPDATE tukang
+    SET
+        rating = (rating_sum + %s) * 1.0 / (IFNULL(jumlah_ulasan, 0) + %s),
+        rating_sum = rating_sum + %s,
+        jumlah_ulasan = IFNULL(jumlah_ulasan, 0) + %s,
+        jumlah_negatif = jumlah_negatif + %s,
+""" + ",\n".join(f"        bintang_{i} = bintang_{i} + %s" for i in STARS) + """
+    WHERE id_tukang=%s
+"""
+
+AGGREGATE_SQL = """
+    SELECT
+        tukang_id,
+        SUM(rating) AS total,
+        COUNT(*) AS n,
+        SUM(sentiment = 'negatif') AS negatif,
+""" + ",\n".join(f"        SUM(rating = {i}) AS bintang_{i}" for i in STARS) + """
+    FROM review
+    GROUP BY tukang_id
+"""
+
+COUNTERS = [("rating_sum", "total"), ("jumlah_ulasan", "n"), ("jumlah_negatif", "negatif")] + [
+    (f"bintang_{i}", f"bintang_{i}") for i in STARS
+]
+
+DRIFT_SQL = f"""
+    SELECT
+        t.id_tukang,
+        t.rating_sum,
+        t.jumlah_ulasan,
+        IFNULL(a.total, 0) AS expected_sum,
+        IFNULL(a.n, 0) AS expected_count
+    FROM tukang t
+    LEFT JOIN ({AGGREGATE_SQL}) a ON a.tukang_id = t.id_tukang
+    WHERE {" OR ".join(f"IFNULL(t.{col}, 0) <> IFNULL(a.{agg}, 0)" for col, agg in COUNTERS)}
+"""
+
+REBUILD_SQL = f"""
+    UPDATE tukang t
+    LEFT JOIN ({AGGREGATE_SQL}) a ON a.tukang_id = t.id_tukang
+    SET
+        {", ".join(f"t.{col} = IFNULL(a.{agg}, 0)" for col, agg in COUNTERS)},
+        t.rating = IFNULL(a.total / a.n, 0)
+"""
+
+
+def apply_reviews(cursor, reviews):
+    """Tambahkan ulasan baru ke counter tukang, satu UPDATE per tukang.
+
+    reviews: iterable (tukang_id, rating, sentiment). Harus dipanggil di
+    transaksi yang sama dengan INSERT ke tabel review.
+    """
+    # [total, n, negatif, bintang_1..5]
+    per_tukang = defaultdict(lambda: [0] * 8)
+    for tukang_id, rating, sentiment in reviews:
+        rating = int(rating)
+        c = per_tukang[tukang_id]
+        c[0] += rating
+        c[1] += 1
+        c[2] += sentiment == "negatif"
+        if rating in STARS:
+            c[2 + rating] += 1
+
+    cursor.executemany(UPDATE_COUNTER_SQL, [
+        (c[0], c[1], c[0], c[1], *c[2:], tukang_id) for tukang_id, c in per_tukang.items()
+    ])
+
+
+def reconcile(conn, fix=True):
+    """Bandingkan counter dengan tabel review; bangun ulang bila `fix`.
+
+    Return list tukang yang counternya menyimpang.
+    """
+    cur = conn.cursor(dictionary=True)
+    cur.execute(DRIFT_SQL)
+    drift = cur.fetchall()
+
+    if fix and drift:
+        cur.execute(REBUILD_SQL)
+        conn.commit()
+    cur.close()
+    return drift
+
+
+@click.command("reconcile-ratings")
+@click.option("--dry-run", is_flag=True, help="Hanya laporkan selisih, jangan diperbaiki.")
+def reconcile_command(dry_run):
+    """Bangun ulang counter ulasan tukang dari tabel review."""
+    import migrations
+
+    with database.pool.connection() as conn:
+        # kolom counter dibuat oleh migrasi 2 dan 4
+        if any(m.version <= 4 for m in migrations.pending(conn)):
+            raise click.ClickException("Skema belum lengkap; jalankan `flask db upgrade` dulu.")
+        drift = reconcile(conn, fix=not dry_run)
+
+    for d in drift:
+        click.echo(
+            f"tukang {d['id_tukang']}: sum {d['rating_sum']} -> {d['expected_sum']}, "
+            f"jumlah {d['jumlah_ulasan']} -> {d['expected_count']}"
+        )
+    status = "ditemukan" if dry_run else "diperbaiki"
+    click.echo(f"{len(drift)} tukang {status}")
+
+
+def init_app(app):
+    app.cli.add_command(reconcile_command)
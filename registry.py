@@ -0,0 +1,95 @@
+import logging
+import threading
+import time
+
+import click
+
+
+log = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Daftar komponen berat (model, vectorizer, index) yang di-load saat dibutuhkan.
+
+    Setiap komponen didaftarkan dengan fungsi loader. Loader baru dipanggil
+    saat `get()` pertama kali, atau lebih awal lewat `warm()` (background)
+    dan `preload()` (sebelum fork). Waktu load tiap komponen dicatat.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._objects = {}
+        self._locks = {}
+        self._timings = {}
+        self._errors = {}
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def names(self):
+        return list(self._loaders)
+
+    def loaded(self, name):
+        return name in self._objects
+
+    def get(self, name):
+        obj = self._objects.get(name)
+        if obj is not None:
+            return obj
+
+        with self._locks[name]:
+            if name not in self._objects:
+                start = time.perf_counter()
+                try:
+                    self._objects[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._timings[name] = round((time.perf_counter() - start) * 1000, 1)
+                self._errors.pop(name, None)
+                log.info("komponen %s di-load dalam %.1f ms", name, self._timings[name])
+        return self._objects[name]
+
+    def preload(self, names=None):
+        """Load semua (atau sebagian) komponen sekarang juga, berurutan."""
+        for name in names or list(self._loaders):
+            self.get(name)
+        return self.timings()
+
+    def warm(self, names=None):
+        """Load komponen di thread background; request tetap bisa dilayani."""
+        def run():
+            for name in names or list(self._loaders):
+                try:
+                    self.get(name)
+                except Exception:
+                    log.exception("gagal warm-up komponen %s", name)
+
+        thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def timings(self):
+        return dict(self._timings)
+
+    def stats(self):
+        return {
+            name: {
+                "loaded": name in self._objects,
+                "load_ms": self._timings.get(name),
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+
+def init_app(app, registry):
+    @app.cli.command("preload")
+    @click.argument("names", nargs=-1)
+    def preload_command(names):
+        """Load model/index sekarang dan tampilkan waktu load per komponen."""
+        timings = registry.preload(list(names) or None)
+        for name, ms in timings.items():
+            click.echo(f"{name:<15} {ms:>10.1f} ms")
+        click.echo(f"{'total':<15} {sum(timings.values()):>10.1f} ms")
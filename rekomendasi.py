@@ -0,0 +1,513 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+
+from cache import LRUCache
+
+
+log = logging.getLogger(__name__)
+
+
+# kolom fitur per tukang, disimpan sejajar dengan baris matriks tf-idf
+RATING, JUMLAH_ULASAN, JUMLAH_NEGATIF = range(3)
+
+Hit = namedtuple("Hit", "row similarity score rating jumlah_ulasan")
+
+
+def normalisasi(text):
+    return " ".join(text.lower().split())
+
+
+def dokumen(t):
+    return f"{t['keahlian']} {t['pengalaman']}"
+
+
+def fitur(t):
+    return (
+        float(t.get("rating") or 0),
+        float(t.get("jumlah_ulasan") or 0),
+        float(t.get("jumlah_negatif") or 0),
+    )
+
+
+class Ranker:
+    """Skor gabungan: kemiripan tf-idf, rating (bayesian) dan porsi ulasan negatif.
+
+    rating_bayes = (prior_count * rata2_global + rating * n) / (prior_count + n)
+    skor = w_similarity * sim + w_rating * rating_bayes / 5 - w_negatif * negatif / n
+    """
+
+    def __init__(self, w_similarity=0.7, w_rating=0.3, w_negatif=0.2, prior_count=5):
+        self.w_similarity = w_similarity
+        self.w_rating = w_rating
+        self.w_negatif = w_negatif
+        self.prior_count = prior_count
+
+    def score(self, sims, features, rating_mean):
+        rating = features[:, RATING]
+        n = features[:, JUMLAH_ULASAN]
+        negatif = features[:, JUMLAH_NEGATIF]
+
+        # prior_count=0 dan n=0 akan jadi 0/0 (NaN) dan merusak urutan top-k
+        bayes = (self.prior_count * rating_mean + rating * n) / np.maximum(self.prior_count + n, 1)
+        porsi_negatif = np.divide(negatif, n, out=np.zeros_like(n), where=n > 0)
+        return (self.w_similarity * sims
+                + self.w_rating * bayes / 5.0
+                - self.w_negatif * porsi_negatif)
+
+
+class Snapshot:
+    """Versi index yang tidak pernah diubah setelah dibuat (immutable).
+
+    Baris disimpan dalam dua bagian: `base` hasil fit terakhir dan `delta`
+    berisi baris yang ditambah/diubah sejak itu. Baris lama yang diganti
+    atau dihapus hanya ditandai mati di `alive` (tombstone).
+
+    `base_postings` adalah matriks base dalam format CSC, yaitu inverted
+    index term -> daftar tukang yang memuat term tersebut. `features`
+    (rating, jumlah_ulasan, jumlah_negatif) sejajar dengan posisi baris.
+    """
+
+    def __init__(self, version=0, vectorizer=None, base_matrix=None, base_postings=None,
+                 base_rows=(), delta_matrix=None, delta_rows=(), alive=None,
+                 features=None, pos_by_id=None):
+        self.version = version
+        self.vectorizer = vectorizer
+        self.base_matrix = base_matrix
+        self.base_postings = base_postings
+        self.base_rows = list(base_rows)
+        self.delta_matrix = delta_matrix
+        self.delta_rows = list(delta_rows)
+        self.alive = np.zeros(0, dtype=bool) if alive is None else alive
+        self.features = np.zeros((0, 3)) if features is None else features
+        self.pos_by_id = pos_by_id or {}
+        self.update_rating_mean()
+
+    def update_rating_mean(self):
+        """Rata-rata rating global (prior bayesian) dari tukang yang sudah diulas."""
+        rated = self.alive & (self.features[:, JUMLAH_ULASAN] > 0)
+        self.rating_mean = float(self.features[rated, RATING].mean()) if rated.any() else 0.0
+
+    @classmethod
+    def fit(cls, rows, version):
+        if not rows:
+            return cls(version)
+
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer()
+        matrix = vectorizer.fit_transform([dokumen(t) for t in rows]).tocsr()
+        return cls.from_matrix(version, vectorizer, matrix, rows)
+
+    @classmethod
+    def from_matrix(cls, version, vectorizer, matrix, rows, features=None):
+        return cls(
+            version=version,
+            vectorizer=vectorizer,
+            base_matrix=matrix,
+            base_postings=matrix.tocsc(),
+            base_rows=rows,
+            delta_matrix=sparse.csr_matrix((0, matrix.shape[1])),
+            alive=np.ones(len(rows), dtype=bool),
+            features=np.array([fitur(t) for t in rows], dtype=float).reshape(-1, 3)
+            if features is None else features,
+            pos_by_id={t["id_tukang"]: i for i, t in enumerate(rows)},
+        )
+
+    def replace(self, **changes):
+        fields = dict(
+            version=self.version + 1,
+            vectorizer=self.vectorizer,
+            base_matrix=self.base_matrix,
+            base_postings=self.base_postings,
+            base_rows=self.base_rows,
+            delta_matrix=self.delta_matrix,
+            delta_rows=self.delta_rows,
+            alive=self.alive,
+            features=self.features,
+            pos_by_id=self.pos_by_id,
+        )
+        fields.update(changes)
+        return Snapshot(**fields)
+
+    @property
+    def n_base(self):
+        return len(self.base_rows)
+
+    def __len__(self):
+        return len(self.pos_by_id)
+
+    def row(self, pos):
+        if pos < self.n_base:
+            return self.base_rows[pos]
+        return self.delta_rows[pos - self.n_base]
+
+    def transform(self, text):
+        return self.vectorizer.transform([text])
+
+    def vector(self, pos):
+        if pos < self.n_base:
+            return self.base_matrix[pos]
+        return self.delta_matrix[pos - self.n_base]
+
+    def candidates(self, text):
+        """Skor cosine hanya untuk tukang yang punya minimal satu term query.
+
+        Return (posisi, skor). Baris mati (tombstone) sudah dibuang.
+        """
+        if self.vectorizer is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        q = self.transform(text).tocsr()
+        if q.nnz == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        # postings setiap term query; vektor tf-idf sudah dinormalisasi l2
+        # sehingga cosine = jumlah bobot term yang sama (dot product)
+        sub = self.base_postings[:, q.indices]
+        weights = np.repeat(q.data, np.diff(sub.indptr))
+        pos = sub.indices
+        vals = sub.data * weights
+
+        if self.delta_rows:
+            delta = (self.delta_matrix @ q.T).tocoo()
+            pos = np.concatenate([pos, delta.row + self.n_base])
+            vals = np.concatenate([vals, delta.data])
+
+        cand, inverse = np.unique(pos, return_inverse=True)
+        scores = np.bincount(inverse, weights=vals)
+
+        live = self.alive[cand]
+        return cand[live], scores[live]
+
+    def search(self, text, threshold=0.1, limit=None, offset=0, ranker=None):
+        """Top-k tukang dengan kemiripan >= threshold, urut skor menurun.
+
+        Tanpa `ranker` skor = kemiripan tf-idf. Return (hasil, total) dengan
+        hasil berupa list `Hit` untuk halaman `offset`..`offset + limit`.
+        """
+        cand, sims = self.candidates(text)
+        keep = sims >= threshold
+        cand, sims = cand[keep], sims[keep]
+        total = len(cand)
+
+        end = total if limit is None else min(total, offset + limit)
+        if offset >= end:
+            return [], total
+
+        features = self.features[cand]
+        scores = sims if ranker is None else ranker.score(sims, features, self.rating_mean)
+
+        if end < total:
+            top = np.argpartition(-scores, end - 1)[:end]
+        else:
+            top = np.arange(total)
+        top = top[np.argsort(-scores[top], kind="stable")][offset:end]
+
+        return [
+            Hit(self.row(cand[i]), float(sims[i]), float(scores[i]),
+                float(features[i, RATING]), int(features[i, JUMLAH_ULASAN]))
+            for i in top
+        ], total
+
+
+class RecommendationIndex:
+    """Index rekomendasi tukang (content based filtering) yang bisa diupdate.
+
+    Pembaca cukup mengambil `index.snapshot` lalu memakai objek itu; tidak
+    ada lock di jalur baca. Penulis (route admin) membuat snapshot baru
+    lalu menukar referensinya secara atomik.
+
+    Hasil pencarian disimpan di cache LRU dengan key query yang sudah
+    dinormalisasi. Perubahan satu tukang hanya menghapus entri query yang
+    memuat tukang itu sebagai kandidat; refit menghapus semuanya. Setiap
+    perubahan menaikkan `_generation` supaya pencarian yang sedang berjalan
+    dengan data lama tidak menyimpan hasilnya. Query yang di-`warm()`
+    diisi ulang di background setelah invalidasi. Perubahan dari worker lain
+    tidak ada di snapshot proses ini; `request_refit()` meminta thread
+    background me-refit dari database.
+    """
+
+    def __init__(self, loader, refit_interval=300, max_delta_ratio=0.2, ranker=None,
+                 cache_size=512, cache_ttl=600, max_age=0, prior_tolerance=0.01, refit_delay=5):
+        self.loader = loader
+        self.refit_delay = refit_delay
+        self.prior_tolerance = prior_tolerance
+        self.refit_interval = refit_interval
+        self.max_age = max_age
+        self.max_delta_ratio = max_delta_ratio
+        self.ranker = ranker or Ranker()
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.snapshot = Snapshot()
+        self.loaded = False
+        self._generation = 0
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._stale_vocabulary = False
+        self._refitted_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._warm_queries = ()
+        self._warm_limit = None
+        self._warming = threading.Lock()
+
+    def search(self, text, threshold=0.1, limit=None, offset=0):
+        generation = self._generation
+        key = (normalisasi(text), threshold, limit, offset)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self.snapshot.search(text, threshold, limit, offset, ranker=self.ranker)
+        if generation == self._generation:
+            self.cache.set(key, result)
+        return result
+
+    def invalidate(self, positions=None):
+        """Hapus cache; dengan `positions` hanya query yang memuat baris itu.
+
+        Baris (tukang) ikut menentukan hasil sebuah query bila kemiripannya
+        >= threshold, jadi hanya entri itu yang bisa berubah.
+        """
+        self._generation += 1
+        snap = self.snapshot
+        if positions is None or snap.vectorizer is None:
+            self.cache.clear()
+        else:
+            texts = sorted({key[0] for key in self.cache.keys()})
+            if texts:
+                rows = sparse.vstack([snap.vector(p) for p in positions], format="csr")
+                sims = (snap.vectorizer.transform(texts) @ rows.T).toarray().max(axis=1)
+                sim_by_text = dict(zip(texts, sims))
+                # query yang muncul setelah keys() dianggap terkena
+                self.cache.delete_where(lambda key: sim_by_text.get(key[0], 1.0) >= key[1])
+        self._rewarm()
+
+    def warm(self, queries, limit=None):
+        """Isi cache untuk query yang sudah pasti sering dipakai (label deteksi)."""
+        self._warm_queries = tuple(queries)
+        self._warm_limit = limit
+        for text in self._warm_queries:
+            self.search(text, limit=limit)
+
+    def _rewarm(self):
+        if not self._warm_queries or not self._warming.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                for text in self._warm_queries:
+                    self.search(text, limit=self._warm_limit)
+            except Exception:
+                log.exception("gagal mengisi ulang cache rekomendasi")
+            finally:
+                self._warming.release()
+
+        threading.Thread(target=run, name="rekomendasi-warm", daemon=True).start()
+
+    def refit(self):
+        """Load ulang semua tukang dari database dan fit ulang vectorizer."""
+        start = time.perf_counter()
+        with self._write_lock:
+            rows = self.loader()
+            self.snapshot = Snapshot.fit(rows, self.snapshot.version + 1)
+            self.loaded = True
+            self._dirty = False
+            self._stale_vocabulary = False
+            self._refitted_at = time.monotonic()
+            self.invalidate()
+        log.info("index rekomendasi di-refit: %d tukang (%.1f ms)",
+                 len(rows), (time.perf_counter() - start) * 1000)
+
+    def upsert(self, row):
+        """Tambah tukang baru atau ganti vektor tukang yang sudah ada.
+
+        Sebelum index pertama kali di-load, perubahan diabaikan karena
+        `refit()` nanti membaca data terbaru langsung dari database.
+        """
+        if not self.loaded:
+            return
+
+        with self._write_lock:
+            snap = self.snapshot
+            if snap.vectorizer is None:
+                self.snapshot = Snapshot.fit([row], snap.version + 1)
+                self.invalidate()
+                return
+
+            vec = snap.vectorizer.transform([dokumen(row)]).tocsr()
+            # kata di luar vocabulary fit terakhir hilang dari vektor; tukang
+            # itu baru bisa ditemukan lewat kata tersebut setelah refit
+            vocabulary = snap.vectorizer.vocabulary_
+            if any(t not in vocabulary for t in snap.vectorizer.build_analyzer()(dokumen(row))):
+                self._stale_vocabulary = True
+                self.request_refit()
+            alive = np.append(snap.alive, True)
+            old = snap.pos_by_id.get(row["id_tukang"])
+            if old is not None:
+                alive[old] = False
+
+            pos_by_id = dict(snap.pos_by_id)
+            pos_by_id[row["id_tukang"]] = len(alive) - 1
+
+            self.snapshot = snap.replace(
+                delta_matrix=sparse.vstack([snap.delta_matrix, vec], format="csr"),
+                delta_rows=snap.delta_rows + [row],
+                alive=alive,
+                features=np.vstack([snap.features, fitur(row)]),
+                pos_by_id=pos_by_id,
+            )
+            self._dirty = True
+            # query yang cocok dengan teks lama maupun teks baru
+            self.invalidate([len(alive) - 1] + ([old] if old is not None else []))
+
+    def delete(self, id_tukang):
+        if not self.loaded:
+            return
+
+        with self._write_lock:
+            snap = self.snapshot
+            pos = snap.pos_by_id.get(id_tukang)
+            if pos is None:
+                return
+
+            alive = snap.alive.copy()
+            alive[pos] = False
+            pos_by_id = dict(snap.pos_by_id)
+            del pos_by_id[id_tukang]
+
+            self.snapshot = snap.replace(alive=alive, pos_by_id=pos_by_id)
+            self._dirty = True
+            self.invalidate([pos])
+
+    def add_review(self, id_tukang, rating, sentiment):
+        """Perbarui fitur ranking satu tukang setelah ada ulasan baru.
+
+        Baris fitur ditulis dengan satu assignment numpy, jadi pembaca
+        melihat nilai lama atau baru secara utuh tanpa perlu snapshot baru.
+        """
+        if not self.loaded:
+            return
+
+        with self._write_lock:
+            snap = self.snapshot
+            pos = snap.pos_by_id.get(id_tukang)
+            if pos is None:
+                return
+
+            avg, n, negatif = snap.features[pos]
+            snap.features[pos] = (
+                (avg * n + float(rating)) / (n + 1),
+                n + 1,
+                negatif + (sentiment == "negatif"),
+            )
+            # prior ikut berubah, bukan menunggu refit berikutnya. prior
+            # menggeser skor semua tukang: bila bergeser lebih dari
+            # toleransi, semua entri cache dihapus; di bawah itu skor lain
+            # berubah < w_rating * toleransi / 5 dan dibiarkan sampai TTL
+            old_mean = snap.rating_mean
+            snap.update_rating_mean()
+            if abs(snap.rating_mean - old_mean) > self.prior_tolerance:
+                self.invalidate()
+            else:
+                self.invalidate([pos])
+
+    def compact(self):
+        """Gabungkan delta ke base dan buang tombstone tanpa fit ulang."""
+        with self._write_lock:
+            snap = self.snapshot
+            if snap.vectorizer is None:
+                return
+
+            keep = np.flatnonzero(snap.alive)
+            matrix = sparse.vstack([snap.base_matrix, snap.delta_matrix], format="csr")[keep]
+            rows = [snap.row(i) for i in keep]
+            self.snapshot = Snapshot.from_matrix(
+                snap.version + 1, snap.vectorizer, matrix, rows, snap.features[keep]
+            )
+            self._dirty = False
+
+    def needs_refit(self):
+        snap = self.snapshot
+        total = len(snap.alive)
+        stale = len(snap.delta_rows) + int(total - snap.alive.sum())
+        return total > 0 and stale / total > self.max_delta_ratio
+
+    def maintain(self):
+        """Dipanggil berkala: refit bila delta sudah besar, kalau tidak compact.
+
+        Upsert dengan kata di luar vocabulary juga memicu refit (compact
+        memakai vocabulary lama). Dengan `max_age` index juga di-refit bila umurnya sudah lewat, walaupun
+        tidak ada perubahan lokal: dengan beberapa worker, perubahan dari
+        worker lain hanya terlihat lewat refit dari database.
+        """
+        if self.max_age and time.monotonic() - self._refitted_at >= self.max_age:
+            self.refit()
+            return
+        if not self._dirty:
+            return
+        if self._stale_vocabulary or self.needs_refit():
+            self.refit()
+        else:
+            self.compact()
+
+    def request_refit(self):
+        """Refit secepatnya di thread background (ada penulisan di worker lain).
+
+        Permintaan yang berdekatan digabung: paling sering satu refit per
+        `refit_delay` detik.
+        """
+        if self.loaded:
+            self._wake.set()
+
+    def start_background(self):
+        # setelah fork thread milik proses induk tidak ikut, jadi cek is_alive
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        stop = self._stop = threading.Event()
+        wake = self._wake
+
+        def loop():
+            next_maintain = time.monotonic() + self.refit_interval
+            while True:
+                requested = wake.wait(max(0.0, next_maintain - time.monotonic()))
+                if stop.is_set():
+                    break
+                try:
+                    if requested:
+                        if stop.wait(max(0.0, self._refitted_at + self.refit_delay - time.monotonic())):
+                            break
+                        wake.clear()
+                        self.refit()
+                    else:
+                        next_maintain = time.monotonic() + self.refit_interval
+                        self.maintain()
+                except Exception:
+                    log.exception("gagal memelihara index rekomendasi")
+
+        self._thread = threading.Thread(target=loop, name="rekomendasi-refit", daemon=True)
+        self._thread.start()
+
+    def stop_background(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._wake.clear()
+
+    def stats(self):
+        snap = self.snapshot
+        return {
+            "version": snap.version,
+            "tukang": len(snap),
+            "base_rows": snap.n_base,
+            "delta_rows": len(snap.delta_rows),
+            "tombstones": int(len(snap.alive) - snap.alive.sum()),
+            "cache": self.cache.stats(),
+        }
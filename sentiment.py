@@ -0,0 +1,357 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+import click
+import numpy as np
+
+import database
+
+
+log = logging.getLogger(__name__)
+
+LATEST = "LATEST"
+CHECKPOINT = re.compile(r"^sentiment-(\d+)\.joblib$")
+
+# fitur di-hash, tidak ada vocabulary yang perlu di-fit (stateless);
+# bigram supaya "tidak rapi" berbeda dengan "rapi"
+FEATURES = {
+    "n_features": 2 ** 18,
+    "ngram_range": (1, 2),
+    "alternate_sign": False,
+    "norm": "l2",
+    "lowercase": True,
+}
+
+# review diambil berurutan id_review (PRIMARY), satu batch per query
+TRAIN_SQL = """
+    SELECT id_review, review_text, rating FROM review
+    WHERE id_review > %s
+    ORDER BY id_review
+    LIMIT %s
+"""
+
+
+def label_from_rating(rating, positif_min=4, negatif_max=2):
+    """Label training dari bintang: 1 positif, 0 negatif, None dilewati.
+
+    Kolom `sentiment` berisi prediksi model sendiri, jadi bukan label;
+    bintang yang diberikan customer yang dipakai. Bintang di tengah
+    (default 3) ambigu dan tidak ikut training.
+    """
+    if rating is None:
+        return None
+    if rating >= positif_min:
+        return 1
+    if rating <= negatif_max:
+        return 0
+    return None
+
+
+def fetch_reviews(after_id, limit):
+    with database.pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute(TRAIN_SQL, (after_id, limit))
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+
+class SentimentModel:
+    """HashingVectorizer + SGDClassifier (linear, bisa partial_fit).
+
+    Ukuran model tetap (n_features koefisien) berapapun jumlah review yang
+    sudah dipelajari. `last_id` adalah id_review terakhir yang sudah masuk
+    training, supaya trainer bisa lanjut dari checkpoint.
+    """
+
+    CLASSES = np.array([0, 1])
+
+    def __init__(self, features=None, classifier=None, version=0, last_id=0, seen=0):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        self.features = dict(features or FEATURES)
+        self.vectorizer = HashingVectorizer(**self.features)
+        self.classifier = classifier or SGDClassifier(
+            loss="hinge", alpha=1e-5, average=True, random_state=0
+        )
+        self.version = version
+        self.last_id = last_id
+        self.seen = seen
+
+    def partial_fit(self, texts, labels):
+        X = self.vectorizer.transform(texts)
+        self.classifier.partial_fit(X, np.asarray(labels), classes=self.CLASSES)
+        self.seen += len(labels)
+
+    def predict(self, texts):
+        return self.classifier.predict(self.vectorizer.transform(texts))
+
+    def state(self):
+        return {
+            "version": self.version,
+            "features": self.features,
+            "classifier": self.classifier,
+            "last_id": self.last_id,
+            "seen": self.seen,
+            "created": time.time(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state["features"], state["classifier"], state["version"],
+                   state["last_id"], state["seen"])
+
+
+class CheckpointStore:
+    """Checkpoint bernomor versi di satu direktori + file LATEST.
+
+    Checkpoint ditulis ke file sementara lalu di-rename, baru setelah itu
+    LATEST diganti; worker yang membaca LATEST selalu mendapat file utuh.
+    Hanya boleh ada satu trainer yang menulis ke direktori yang sama.
+    """
+
+    def __init__(self, directory, keep=5):
+        self.directory = directory
+        self.keep = keep
+
+    def path(self, version):
+        return os.path.join(self.directory, f"sentiment-{version:06d}.joblib")
+
+    def versions(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(int(m.group(1)) for m in map(CHECKPOINT.match, names) if m)
+
+    def latest_version(self):
+        try:
+            with open(os.path.join(self.directory, LATEST)) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load(self, version=None):
+        import joblib
+
+        version = self.latest_version() if version is None else version
+        if version is None:
+            return None
+        return SentimentModel.from_state(joblib.load(self.path(version)))
+
+    def _write_atomic(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def save(self, model):
+        """Simpan model sebagai versi baru; return nomor versinya."""
+        import joblib
+
+        os.makedirs(self.directory, exist_ok=True)
+        model.version = max(self.versions(), default=0) + 1
+        self._write_atomic(self.path(model.version), lambda f: joblib.dump(model.state(), f))
+        self._write_atomic(os.path.join(self.directory, LATEST),
+                           lambda f: f.write(str(model.version).encode()))
+        for old in self.versions()[:-self.keep]:
+            os.unlink(self.path(old))
+        return model.version
+
+
+class OnlineSentiment:
+    """Model sentiment yang dipakai worker, diganti tanpa restart.
+
+    Paling sering sekali per `reload_interval` detik, LATEST dibaca; bila
+    versinya berubah checkpoint baru di-load lalu referensinya ditukar.
+    Request yang sedang berjalan tetap memakai model lama sampai selesai.
+    Model yang belum melihat `min_samples` review dianggap belum siap
+    (`current()` return None) dan pemanggil memakai model lama (pickle).
+    """
+
+    def __init__(self, store, reload_interval=30, min_samples=1000):
+        self.store = store
+        self.reload_interval = reload_interval
+        self.min_samples = min_samples
+        self._model = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.errors = 0
+
+    def reload(self):
+        # request lain tidak menunggu; mereka tetap memakai model yang ada
+        if not self._lock.acquire(blocking=False):
+            return self
+        try:
+            version = self.store.latest_version()
+            current = self._model.version if self._model is not None else None
+            if version is not None and version != current:
+                model = self.store.load(version)
+                self._model = model
+                self.reloads += 1
+                log.info("model sentiment versi %d di-load (%d review)", model.version, model.seen)
+        except Exception:
+            self.errors += 1
+            log.exception("gagal me-load checkpoint sentiment")
+        finally:
+            self._lock.release()
+        return self
+
+    def current(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            self.reload()
+        model = self._model
+        if model is None or model.seen < self.min_samples:
+            return None
+        return model
+
+    def stats(self):
+        model = self._model
+        return {
+            "version": model.version if model else None,
+            "seen": model.seen if model else 0,
+            "last_id": model.last_id if model else 0,
+            "ready": model is not None and model.seen >= self.min_samples,
+            "reloads": self.reloads,
+            "errors": self.errors,
+        }
+
+
+class SentimentTrainer:
+    """Latih model secara incremental dari review baru di database.
+
+    Review diambil per batch (`batch_size`) mulai dari id_review setelah
+    checkpoint terakhir, jadi memori tetap konstan berapapun isi tabel.
+    Setelah review baru habis, model disimpan sebagai checkpoint baru.
+    """
+
+    def __init__(self, store, fetch=fetch_reviews, batch_size=512, interval=60,
+                 positif_min=4, negatif_max=2, on_checkpoint=None):
+        self.store = store
+        self.fetch = fetch
+        self.batch_size = batch_size
+        self.interval = interval
+        self.positif_min = positif_min
+        self.negatif_max = negatif_max
+        self.on_checkpoint = on_checkpoint
+        self.model = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _model(self):
+        if self.model is None:
+            self.model = self.store.load() or SentimentModel()
+        return self.model
+
+    def step(self):
+        """Satu batch; return jumlah baris yang dibaca (0 bila sudah habis)."""
+        model = self._model()
+        rows = self.fetch(model.last_id, self.batch_size)
+        if not rows:
+            return 0
+
+        texts, labels = [], []
+        for _, text, rating in rows:
+            label = label_from_rating(rating, self.positif_min, self.negatif_max)
+            if label is not None and text:
+                texts.append(text)
+                labels.append(label)
+        if labels:
+            model.partial_fit(texts, labels)
+        model.last_id = rows[-1][0]
+        return len(rows)
+
+    def run_once(self, max_batches=None):
+        """Latih sampai review baru habis lalu simpan checkpoint.
+
+        Return versi checkpoint baru, atau None bila tidak ada review baru.
+        """
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            if not self.step():
+                break
+            batches += 1
+        if not batches:
+            return None
+
+        version = self.store.save(self.model)
+        log.info("checkpoint sentiment versi %d (%d review, id terakhir %d)",
+                 version, self.model.seen, self.model.last_id)
+        if self.on_checkpoint is not None:
+            self.on_checkpoint(version)
+        return version
+
+    def start_background(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        stop = self._stop = threading.Event()
+
+        def loop():
+            while True:
+                try:
+                    self.run_once()
+                except Exception:
+                    log.exception("gagal melatih model sentiment")
+                if stop.wait(self.interval):
+                    break
+
+        self._thread = threading.Thread(target=loop, name="sentiment-train", daemon=True)
+        self._thread.start()
+
+    def stop_background(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def init_app(app, trainer, online):
+    @app.cli.group("sentiment")
+    def sentiment_command():
+        """Model sentiment online (incremental)."""
+
+    @sentiment_command.command("train")
+    @click.option("--follow", is_flag=True, help="Terus berjalan dan latih review baru setiap interval.")
+    @click.option("--max-batches", type=int, help="Berhenti setelah N batch.")
+    def train_command(follow, max_batches):
+        """Latih model dari review yang belum dipelajari dan simpan checkpoint."""
+        while True:
+            version = trainer.run_once(max_batches)
+            if version is not None:
+                click.echo(f"checkpoint versi {version}: {trainer.model.seen} review, "
+                           f"id terakhir {trainer.model.last_id}")
+            elif not follow:
+                click.echo("tidak ada review baru")
+            if not follow:
+                break
+            time.sleep(trainer.interval)
+
+    @sentiment_command.command("status")
+    def status_command():
+        """Tampilkan checkpoint yang ada dan versi yang aktif."""
+        latest = online.store.latest_version()
+        for version in online.store.versions():
+            mark = "*" if version == latest else " "
+            click.echo(f"[{mark}] {version}")
+        model = online.store.load()
+        if model is None:
+            click.echo("belum ada checkpoint; jalankan `flask sentiment train`")
+            return
+        ready = "siap" if model.seen >= online.min_samples else f"belum siap (min {online.min_samples})"
+        click.echo(f"versi {model.version}: {model.seen} review, id terakhir {model.last_id}, {ready}")
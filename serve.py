@@ -0,0 +1,245 @@
+"""Entry point produksi: pre-fork, model di-load sekali di proses master.
+
+Master meng-import app, me-load semua komponen registry (model CNN,
+SVM/TF-IDF, index rekomendasi, sentiment), memanggil gc.freeze() lalu
+fork N worker yang menerima koneksi dari socket yang sama. Halaman memori
+model dibagi copy-on-write, sehingga worker tambahan hanya butuh memori
+privatnya sendiri. Koneksi database master ditutup sebelum fork; setiap
+worker membuka pool sendiri saat request pertama.
+
+    python serve.py --workers 4 --bind 0.0.0.0:5000 --threads 1
+
+Thread BLAS/OpenMP/TensorFlow per worker dibatasi `--threads` supaya N
+worker tidak berebut core. Runtime TensorFlow (backend keras) tidak aman
+di-fork setelah berjalan, jadi model keras di-load di setiap worker; pakai
+DETEKSI_BACKEND=tflite supaya model CNN ikut dibagi. Memori tiap worker
+(rss, shared, private, pss) dicatat ke log setiap `--memory-interval`
+detik dan tersedia di /metrics worker.
+
+State antar worker: job deteksi ada di tabel deteksi_jobs, checkpoint
+sentiment di disk, dan cache per proses (profil tukang, index/cache
+rekomendasi, statistik dashboard) diperbarui lewat `app.generations`, mmap
+yang dibuat saat app di-import di master sehingga ikut dibagi ke semua
+worker: ulasan diterapkan per tukang, perubahan data tukang memicu refit. /metrics dan /admin/*-stats tetap per worker.
+
+HTTP di setiap worker dilayani server WSGI threaded milik werkzeug. Server
+itu bukan server produksi: tidak ada timeout request, batas header/body,
+maupun perlindungan klien lambat. Jalankan di belakang reverse proxy
+(nginx) yang mem-buffer request dan response, atau pakai server WSGI
+pre-fork lain yang me-load app sebelum fork (misalnya
+`gunicorn --preload app:app`) supaya copy-on-write dan `generations`
+tetap berlaku.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+
+log = logging.getLogger("serve")
+
+THREAD_ENV = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+              "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS",
+              "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS")
+# backend yang runtime-nya membuat thread saat model di-load
+FORK_UNSAFE_BACKENDS = ("keras",)
+
+
+def pin_threads(n):
+    """Batasi thread per proses; harus sebelum numpy/tensorflow di-import."""
+    for name in THREAD_ENV:
+        os.environ[name] = str(n)
+    os.environ["DETEKSI_NUM_THREADS"] = str(n)
+
+
+def listen(bind, backlog=2048):
+    host, _, port = bind.rpartition(":")
+    sock = socket.create_server((host or "0.0.0.0", int(port)), backlog=backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload(capstone):
+    """Load komponen registry di master; return komponen yang di-load per worker."""
+    per_worker = []
+    for name in capstone.models.names():
+        if (name == "cnn" and not capstone.models.loaded(name)
+                and capstone.app.config["DETEKSI_BACKEND"] in FORK_UNSAFE_BACKENDS):
+            per_worker.append(name)
+            continue
+        try:
+            capstone.models.get(name)
+        except Exception:
+            log.exception("gagal preload %s; di-load di worker saat dibutuhkan", name)
+            per_worker.append(name)
+    for name, ms in capstone.models.timings().items():
+        log.info("preload %-12s %8.1f ms", name, ms)
+    return per_worker
+
+
+class Master:
+    """Fork worker, jalankan ulang yang mati dan catat memorinya."""
+
+    def __init__(self, capstone, sock, workers=2, memory_interval=60, graceful_timeout=30):
+        self.capstone = capstone
+        self.sock = sock
+        self.n = workers
+        self.memory_interval = memory_interval
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}
+        self.started = {}
+        self.running = True
+
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = slot
+            self.started[slot] = time.monotonic()
+            return pid
+
+        code = 0
+        try:
+            self.run_worker(slot)
+        except BaseException:
+            log.exception("worker %d gagal", slot)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def run_worker(self, slot):
+        from werkzeug.serving import make_server
+
+        gc.enable()
+        capstone = self.capstone
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # thread tidak ikut di-fork: index rekomendasi dan trainer (hanya
+        # worker 0) dijalankan lagi di sini
+        capstone.start_background(trainer=slot == 0)
+        missing = [n for n in capstone.models.names() if not capstone.models.loaded(n)]
+        if missing:
+            capstone.models.warm(missing)
+
+        host, port = self.sock.getsockname()[:2]
+        server = make_server(host, port, capstone.app, threaded=True, fd=self.sock.fileno())
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(
+            target=server.shutdown, daemon=True).start())
+        log.info("worker %d (pid %d) siap", slot, os.getpid())
+        server.serve_forever()
+
+    def stop(self, signum, frame):
+        self.running = False
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            slot = self.workers.pop(pid, None)
+            if slot is None or not self.running:
+                continue
+            log.warning("worker %d (pid %d) berhenti dengan kode %d, dijalankan ulang",
+                        slot, pid, os.waitstatus_to_exitcode(status))
+            # worker yang langsung mati lagi: jangan fork terus-menerus
+            if time.monotonic() - self.started[slot] < 1:
+                time.sleep(1)
+            self.spawn(slot)
+
+    def report(self):
+        from metrics import memory_usage
+
+        procs = [("master", os.getpid())] + [
+            (f"worker {slot}", pid) for pid, slot in sorted(self.workers.items(), key=lambda x: x[1])
+        ]
+        total = 0
+        for name, pid in procs:
+            m = memory_usage(pid)
+            if m is None:
+                continue
+            total += m["pss"] or m["rss"]
+            log.info("%-9s pid %-7d rss %7.1f MB  shared %7.1f MB  private %7.1f MB  pss %s",
+                     name, pid, m["rss"] / 2 ** 20, m["shared"] / 2 ** 20, m["private"] / 2 ** 20,
+                     f"{m['pss'] / 2 ** 20:.1f} MB" if m["pss"] is not None else "-")
+        log.info("total memori %.1f MB untuk %d worker", total / 2 ** 20, len(self.workers))
+
+    def shutdown(self):
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.workers:
+            os.kill(pid, signal.SIGKILL)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for slot in range(self.n):
+            self.spawn(slot)
+
+        next_report = time.monotonic() + min(self.memory_interval, 10)
+        while self.running:
+            self.reap()
+            if self.memory_interval and time.monotonic() >= next_report:
+                self.report()
+                next_report = time.monotonic() + self.memory_interval
+            time.sleep(0.5)
+        self.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jalankan app dengan worker pre-fork.")
+    parser.add_argument("--bind", default=os.environ.get("SERVE_BIND", "0.0.0.0:5000"))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("SERVE_WORKERS", os.cpu_count() or 2)))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("SERVE_THREADS", 1)),
+                        help="Thread BLAS/TensorFlow per worker.")
+    parser.add_argument("--memory-interval", type=int,
+                        default=int(os.environ.get("SERVE_MEMORY_INTERVAL", 60)),
+                        help="Catat memori worker setiap N detik (0 = tidak).")
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    args = parser.parse_args()
+
+    pin_threads(args.threads)
+    # master yang me-load model (bukan thread warm-up), trainer hanya di worker 0
+    os.environ["MODEL_WARMUP"] = "lazy"
+    sentiment_train = os.environ.get("SENTIMENT_TRAIN", "off")
+    os.environ["SENTIMENT_TRAIN"] = "off"
+    # penulisan worker lain sampai lewat generations; refit berkala hanya
+    # cadangan untuk perubahan database di luar app
+    os.environ.setdefault("REKOMENDASI_MAX_AGE", "600")
+
+    # saran dokumentasi gc: matikan di master, freeze sebelum fork, enable di worker
+    gc.disable()
+    sock = listen(args.bind)
+
+    import app as capstone
+    import database
+
+    # cek skema; warm-up lazy dan trainer mati di master (worker yang
+    # menjalankan thread background, lihat run_worker)
+    capstone.startup()
+    capstone.app.config["SENTIMENT_TRAIN"] = sentiment_train
+    if isinstance(capstone.schema_check, threading.Thread):
+        capstone.schema_check.join()
+    per_worker = preload(capstone)
+    if per_worker:
+        log.info("di-load per worker: %s", ", ".join(per_worker))
+
+    capstone.stop_background()
+    database.pool.reset()
+    gc.freeze()
+
+    log.info("master pid %d, %d worker di %s", os.getpid(), args.workers, args.bind)
+    Master(capstone, sock, args.workers, args.memory_interval, args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    main()
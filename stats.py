@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+
+import database
+
+
+log = logging.getLogger(__name__)
+
+
+TOTALS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM tukang) AS total_tukang,
+        (SELECT COUNT(*) FROM users WHERE role = 'customer') AS total_customer
+"""
+
+RATING_SQL = """
+    SELECT rating, COUNT(*) AS total
+    FROM review
+    WHERE rating IS NOT NULL
+    GROUP BY rating
+"""
+
+
+class DashboardStats:
+    """Snapshot statistik dashboard admin.
+
+    Dihitung dengan dua query (total + histogram rating GROUP BY), disimpan
+    selama `ttl` detik, lalu di-refresh di background sementara snapshot
+    lama tetap dipakai. Penulisan ulasan/user memperbarui snapshot secara
+    incremental sehingga angka tetap akurat di antara refresh.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def load(self):
+        with database.pool.connection() as conn:
+            cur = conn.cursor(dictionary=True)
+            cur.execute(TOTALS_SQL)
+            totals = cur.fetchone()
+            cur.execute(RATING_SQL)
+            histogram = {int(r["rating"]): int(r["total"]) for r in cur.fetchall()}
+            cur.close()
+
+        return {
+            "total_tukang": int(totals["total_tukang"]),
+            "total_customer": int(totals["total_customer"]),
+            "histogram": histogram,
+        }
+
+    def refresh(self):
+        snapshot = self.load()
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
+        return snapshot
+
+    def _refresh_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            log.exception("gagal refresh statistik dashboard")
+            with self._lock:
+                self._refreshing = False
+
+    def get(self):
+        with self._lock:
+            snapshot = self._snapshot
+            stale = time.monotonic() - self._loaded_at > self.ttl
+            start_refresh = snapshot is not None and stale and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+
+        if snapshot is None:
+            snapshot = self.refresh()
+        elif start_refresh:
+            threading.Thread(target=self._refresh_background, daemon=True).start()
+
+        return self._render(snapshot)
+
+    @staticmethod
+    def _render(snapshot):
+        histogram = snapshot["histogram"]
+        jumlah = sum(histogram.values())
+        total = sum(r * n for r, n in histogram.items())
+        return {
+            "total_tukang": snapshot["total_tukang"],
+            "total_customer": snapshot["total_customer"],
+            "avg_rating": round(total / jumlah, 1) if jumlah else 0,
+            "rating_counts": {i: histogram.get(i, 0) for i in range(1, 6)},
+        }
+
+    def expire(self):
+        """Anggap snapshot basi (ada penulisan di worker lain); refresh di background."""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _update(self, fn):
+        with self._lock:
+            if self._snapshot is None:
+                return
+            snapshot = {
+                "total_tukang": self._snapshot["total_tukang"],
+                "total_customer": self._snapshot["total_customer"],
+                "histogram": dict(self._snapshot["histogram"]),
+            }
+            fn(snapshot)
+            self._snapshot = snapshot
+
+    def add_reviews(self, ratings):
+        def apply(s):
+            for r in ratings:
+                if r is None:
+                    continue
+                s["histogram"][int(r)] = s["histogram"].get(int(r), 0) + 1
+        self._update(apply)
+
+    def add_customer(self, delta=1):
+        def apply(s):
+            s["total_customer"] += delta
+        self._update(apply)
+
+    def add_tukang(self, delta=1):
+        def apply(s):
+            s["total_tukang"] += delta
+        self._update(apply)
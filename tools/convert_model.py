@@ -0,0 +1,140 @@
+"""Konversi model CNN Keras ke TFLite/ONNX dan cek paritas akurasinya.
+
+Folder sampel berisi satu subfolder per label (nama sama dengan LABELS),
+misalnya `samples/Retak Dinding/*.jpg`.
+
+    python tools/convert_model.py --quantize float16 --samples samples/
+    python tools/convert_model.py --quantize int8 --samples samples/ --tolerance 0.02
+    python tools/convert_model.py --format onnx --samples samples/
+"""
+import argparse
+import json
+import os
+import sys
+from itertools import zip_longest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import make_backend  # noqa: E402
+from inference import LABELS, load_image  # noqa: E402
+
+
+EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def load_samples(folder):
+    images, targets = [], []
+    for index, label in enumerate(LABELS):
+        label_dir = os.path.join(folder, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(EXTENSIONS):
+                with open(os.path.join(label_dir, name), "rb") as f:
+                    images.append(load_image(f.read()))
+                targets.append(index)
+    if not images:
+        raise SystemExit(f"Tidak ada gambar sampel di {folder}")
+    return np.stack(images), np.array(targets)
+
+
+def representative(images, targets, n=200, seed=0):
+    """Maksimal `n` gambar, jumlahnya rata per label dan diacak dengan seed tetap.
+
+    Sampel dari load_samples urut per label; potongan pertama saja hanya
+    berisi label awal sehingga range kuantisasi int8 miring.
+    """
+    rng = np.random.default_rng(seed)
+    per_label = [rng.permutation(np.flatnonzero(targets == t)) for t in np.unique(targets)]
+    order = [i for group in zip_longest(*per_label) for i in group if i is not None]
+    picked = np.array(order[:n])
+    return images[rng.permutation(picked)]
+
+
+def convert_tflite(keras_path, output, quantize, samples):
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(keras_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantize == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        if samples is None:
+            raise SystemExit("Kuantisasi int8 butuh --samples untuk representative dataset")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([img[None, ...]] for img in samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    elif quantize == "dynamic":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    with open(output, "wb") as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(keras_path, output):
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(keras_path)
+    spec = (tf.TensorSpec((None, 128, 128, 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, output_path=output)
+
+
+def parity(reference, candidate, images, targets, batch_size=32):
+    ref, cand = [], []
+    for i in range(0, len(images), batch_size):
+        batch = images[i:i + batch_size]
+        ref.append(reference.predict(batch))
+        cand.append(candidate.predict(batch))
+    ref, cand = np.concatenate(ref), np.concatenate(cand)
+
+    return {
+        "samples": int(len(images)),
+        "reference_accuracy": float((ref.argmax(1) == targets).mean()),
+        "converted_accuracy": float((cand.argmax(1) == targets).mean()),
+        "agreement": float((ref.argmax(1) == cand.argmax(1)).mean()),
+        "max_prob_diff": float(np.abs(ref - cand).max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keras", default="model/model_temantukang.keras")
+    parser.add_argument("--format", choices=["tflite", "onnx"], default="tflite")
+    parser.add_argument("--quantize", choices=["none", "dynamic", "float16", "int8"], default="none")
+    parser.add_argument("--output")
+    parser.add_argument("--samples", help="folder sampel berlabel untuk cek paritas")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="penurunan akurasi maksimum yang masih diterima")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.keras)[0] + "." + args.format
+    images, targets = load_samples(args.samples) if args.samples else (None, None)
+
+    if args.format == "tflite":
+        samples = representative(images, targets) if images is not None else None
+        convert_tflite(args.keras, output, args.quantize, samples)
+    else:
+        convert_onnx(args.keras, output)
+    print(f"model tersimpan di {output} ({os.path.getsize(output) / 1024:.0f} KB)")
+
+    if images is None:
+        return
+
+    report = parity(make_backend("keras", args.keras), make_backend(args.format, output),
+                    images, targets)
+    print(json.dumps(report, indent=2))
+
+    drop = report["reference_accuracy"] - report["converted_accuracy"]
+    if drop > args.tolerance:
+        raise SystemExit(f"Akurasi turun {drop:.3f}, melebihi toleransi {args.tolerance}")
+
+
+if __name__ == "__main__":
+    main()
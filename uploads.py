@@ -0,0 +1,224 @@
+import hashlib
+import io
+import os
+import re
+import tempfile
+import time
+from collections import namedtuple
+
+import click
+from flask import request
+
+FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif", "BMP": "bmp"}
+THUMB_SUFFIX = ".thumb.webp"
+KEY = re.compile(r"^[0-9a-f]{64}$")
+
+Upload = namedtuple("Upload", "key path thumb created")
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class UploadStore:
+    """Penyimpanan upload berdasarkan hash isi (sha256), di-shard ke subdirektori.
+
+    File disimpan sebagai `<root>/ab/cd/<sha256>.<ext>`: dua level shard
+    (65536 direktori) menjaga tiap direktori tetap kecil walaupun jumlah
+    file jutaan. Gambar yang sama hanya disimpan sekali. Penulisan lewat
+    file sementara + rename sehingga pembaca tidak pernah melihat file
+    setengah jadi. Setiap upload juga punya thumbnail WebP kecil untuk
+    tampilan; gambar aslinya tetap bisa dibuka lewat link.
+    """
+
+    def __init__(self, root, url_prefix="uploads", shard_depth=2, shard_width=2,
+                 thumb_size=(256, 256), thumb_quality=80):
+        self.root = root
+        self.url_prefix = url_prefix
+        self.shard_depth = shard_depth
+        self.shard_width = shard_width
+        self.thumb_size = thumb_size
+        self.thumb_quality = thumb_quality
+
+    def shard(self, key):
+        w = self.shard_width
+        return [key[i * w:(i + 1) * w] for i in range(self.shard_depth)]
+
+    def relpath(self, key, suffix):
+        return "/".join(self.shard(key) + [key + suffix])
+
+    def path(self, key, suffix):
+        return os.path.join(self.root, *self.shard(key), key + suffix)
+
+    def url_path(self, relpath):
+        """Path relatif terhadap folder static, untuk url_for('static')."""
+        return f"{self.url_prefix}/{relpath}"
+
+    def _write_atomic(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _thumbnail(self, image):
+        # dibuat di thread request: draft() men-decode JPEG di skala kecil,
+        # method=0 encoder WebP tercepat (ukuran file hampir sama)
+        from PIL import Image
+
+        image.draft("RGB", self.thumb_size)
+        image = image.convert("RGB")
+        image.thumbnail(self.thumb_size, Image.LANCZOS)
+        buf = io.BytesIO()
+        image.save(buf, "WEBP", quality=self.thumb_quality, method=0)
+        return buf.getvalue()
+
+    def put(self, data):
+        """Simpan bytes gambar; return Upload. InvalidImage bila bukan gambar."""
+        from PIL import Image
+
+        try:
+            image = Image.open(io.BytesIO(data))
+            ext = FORMATS.get(image.format)
+        except Exception:
+            ext = None
+        if ext is None:
+            raise InvalidImage("File bukan gambar yang didukung")
+
+        key = hashlib.sha256(data).hexdigest()
+        suffix = "." + ext
+        path = self.path(key, suffix)
+        thumb = self.path(key, THUMB_SUFFIX)
+
+        created = not os.path.exists(path)
+        if created:
+            self._write_atomic(path, data)
+        else:
+            # upload ulang memperpanjang umurnya (lihat expire)
+            os.utime(path)
+        if not os.path.exists(thumb):
+            self._write_atomic(thumb, self._thumbnail(image))
+
+        return Upload(
+            key,
+            self.url_path(self.relpath(key, suffix)),
+            self.url_path(self.relpath(key, THUMB_SUFFIX)),
+            created,
+        )
+
+    def expire(self, max_age=30 * 86400, dry_run=False):
+        """Hapus file (dan thumbnail) yang lebih tua dari max_age detik.
+
+        Murni berdasarkan umur: hasil deteksi tidak disimpan di database,
+        jadi tidak ada referensi yang bisa dicek. Umur dihitung dari mtime
+        file asli, yang diperbarui setiap gambar yang sama di-upload ulang.
+        Halaman hasil hanya dirender saat upload, sehingga link lama ke file
+        yang sudah kedaluwarsa menjadi 404. Sisa file sementara dari
+        penulisan yang gagal ikut dibersihkan. Return (jumlah file, bytes).
+        """
+        cutoff = time.time() - max_age
+        removed, freed = 0, 0
+
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                key = name.partition(".")[0]
+                stale_tmp = name.startswith(".tmp-") and os.path.getmtime(path) < time.time() - 3600
+                if not stale_tmp and (dirpath == self.root or not KEY.match(key)):
+                    continue
+                if not stale_tmp and os.path.getmtime(self._original(dirpath, key, path)) >= cutoff:
+                    continue
+                size = os.path.getsize(path)
+                if not dry_run:
+                    os.unlink(path)
+                removed += 1
+                freed += size
+            if dirpath != self.root and not dry_run and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+        return removed, freed
+
+    def _original(self, dirpath, key, path):
+        # umur thumbnail mengikuti file aslinya (mtime diperbarui saat upload ulang)
+        if not path.endswith(THUMB_SUFFIX):
+            return path
+        for name in os.listdir(dirpath):
+            if name.startswith(key) and not name.endswith(THUMB_SUFFIX):
+                return os.path.join(dirpath, name)
+        return path
+
+    def import_flat(self, directory, remove=False):
+        """Pindahkan file lama di direktori flat ke store (dedup). Return (diimpor, dilewati)."""
+        imported, skipped = 0, 0
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            try:
+                self.put(data)
+            except InvalidImage:
+                skipped += 1
+                continue
+            imported += 1
+            if remove:
+                os.unlink(path)
+        return imported, skipped
+
+
+def static_prefix(static_folder, root):
+    """Path `root` relatif terhadap folder static; RuntimeError bila di luar static."""
+    static = os.path.realpath(static_folder)
+    root = os.path.realpath(root)
+    if root == static or os.path.commonpath([root, static]) != static:
+        raise RuntimeError(
+            f"UPLOAD_DIR ({root}) harus berupa subdirektori folder static ({static}); "
+            "file upload disajikan lewat url_for('static')"
+        )
+    return os.path.relpath(root, static).replace(os.sep, "/")
+
+
+def init_app(app, store, max_age=31536000):
+    # dicek saat startup: upload di luar static tersimpan tapi tidak bisa diakses
+    store.url_prefix = static_prefix(app.static_folder, store.root)
+    prefix = f"/static/{store.url_prefix}/"
+
+    @app.after_request
+    def immutable_uploads(response):
+        # nama file = hash isi, jadi isinya tidak pernah berubah
+        if (request.endpoint == "static" and request.path.startswith(prefix)
+                and KEY.match(request.path.rsplit("/", 1)[-1].partition(".")[0])):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response.cache_control.immutable = True
+        return response
+
+    @app.cli.group("uploads")
+    def uploads_command():
+        """Kelola file upload deteksi."""
+
+    @uploads_command.command("expire")
+    @click.option("--max-age-days", default=30,
+                  help="Hapus upload yang tidak di-upload ulang selama N hari.")
+    @click.option("--dry-run", is_flag=True)
+    def expire_command(max_age_days, dry_run):
+        """Hapus upload yang lebih tua dari N hari (berdasarkan umur, bukan referensi)."""
+        removed, freed = store.expire(max_age=max_age_days * 86400, dry_run=dry_run)
+        status = "akan dihapus" if dry_run else "dihapus"
+        click.echo(f"{removed} file {status} ({freed / 1024 / 1024:.1f} MB)")
+
+    @uploads_command.command("import")
+    @click.option("--remove", is_flag=True, help="Hapus file lama setelah diimpor.")
+    def import_command(remove):
+        """Pindahkan upload lama (nama file dari client) ke store berbasis hash."""
+        imported, skipped = store.import_flat(store.root, remove=remove)
+        click.echo(f"{imported} file diimpor, {skipped} bukan gambar dilewati")